@@ -82,10 +82,14 @@ UP, DOWN, LEFT, RIGHT = -10, 10, -1, 1
 UP_RIGHT, DOWN_RIGHT, DOWN_LEFT, UP_LEFT = -9, 11, 9, -11
 DIRECTIONS = (UP, UP_RIGHT, RIGHT, DOWN_RIGHT, DOWN, DOWN_LEFT, LEFT, UP_LEFT)
 
+# The squares, and the rays from each square in each direction, are computed
+# once in `othello_tables` rather than on every call.
+import othello_tables as tables
+
 class OthelloBase:
     def squares(self):
         """List all the valid squares on the board."""
-        return [i for i in range(11, 89) if 1 <= (i % 10) <= 8]
+        return tables.SQUARES
 
 
     def initial_board(self):
@@ -124,7 +128,7 @@ class OthelloBase:
 
     def is_valid(self, move):
         """Is move a square on the board?"""
-        return isinstance(move, int) and move in self.squares()
+        return isinstance(move, int) and move in tables.SQUARE_SET
 
 
     def opponent(self, player):
@@ -137,19 +141,31 @@ class OthelloBase:
         Find a square that forms a bracket with `square` for `player` in the given
         `direction`.  Returns None if no such square exists.
         """
-        bracket = square + direction
-        if board[bracket] == player:
-            return None
+        ray = tables.DIRECTION_RAYS[square][direction]
         opp = self.opponent(player)
-        while board[bracket] == opp:
-            bracket += direction
-        return None if board[bracket] in (OUTER, EMPTY) else bracket
+        if len(ray) < 2 or board[ray[0]] != opp:
+            return None
+        for sq in ray:
+            piece = board[sq]
+            if piece != opp:
+                return sq if piece == player else None
+        return None
 
 
     def is_legal(self, move, player, board):
         """Is this a legal move for the player?"""
-        hasbracket = lambda direction: self.find_bracket(move, player, board, direction)
-        return board[move] == EMPTY and any(map(hasbracket, DIRECTIONS))
+        if board[move] != EMPTY:
+            return False
+        opp = self.opponent(player)
+        for ray in tables.RAYS[move]:
+            if board[ray[0]] == opp:
+                for sq in ray:
+                    piece = board[sq]
+                    if piece != opp:
+                        if piece == player:
+                            return True
+                        break
+        return False
 
 
     ### Making moves
@@ -176,6 +192,41 @@ class OthelloBase:
             square += direction
 
 
+    def find_flips(self, move, player, board):
+        """List the squares that would flip if player made the move."""
+        flips = []
+        opp = self.opponent(player)
+        for ray in tables.RAYS[move]:
+            if board[ray[0]] == opp:
+                for i, sq in enumerate(ray):
+                    piece = board[sq]
+                    if piece != opp:
+                        if piece == player:
+                            flips.extend(ray[:i])
+                        break
+        return flips
+
+
+    # A search walks its whole tree on one board: each move is made in place and
+    # then taken back, instead of being made on a fresh copy of the board.
+
+    def do_move(self, move, player, board):
+        """Make the move in place and return the squares it flipped."""
+        flips = self.find_flips(move, player, board)
+        board[move] = player
+        for sq in flips:
+            board[sq] = player
+        return flips
+
+
+    def undo_move(self, move, player, board, flips):
+        """Take back a move made by `do_move`, given the squares it flipped."""
+        board[move] = EMPTY
+        opp = self.opponent(player)
+        for sq in flips:
+            board[sq] = opp
+
+
     ### Monitoring players
 
     class IllegalMoveError(Exception):
@@ -187,6 +238,15 @@ class OthelloBase:
         def __str__(self):
             return '%s cannot move to square %d' % (PLAYERS[self.player], self.move)
 
+    # Raised by a front end whose window is closed during a game, and inside a
+    # search whose result it no longer wants.  They live here, not with the
+    # GUI, so that code driving any engine (the shell, say) can catch them.
+    class WindowClosed(Exception):
+        """Raised by `play` when the window is closed during a game."""
+
+    class SearchCancelled(Exception):
+        """Raised inside a search when the GUI no longer wants its result."""
+
 
     def legal_moves(self, player, board):
         """Get a list of all legal moves for player."""
@@ -211,13 +271,23 @@ class OthelloBase:
         board = self.initial_board()
         player = BLACK
         strategy = lambda who: black_strategy if who == BLACK else white_strategy
-        while player is not None:
-            move = self.get_move(strategy(player), player, board)
-            self.make_move(move, player, board)
-            #print(self.print_board(board))
-            player = self.next_player(board, player)
+        try:
+            while player is not None:
+                move = self.get_move(strategy(player), player, board)
+                self.make_move(move, player, board)
+                #print(self.print_board(board))
+                player = self.next_player(board, player)
+        finally:
+            self.stop_pondering(black_strategy, white_strategy)
         return board, self.score(BLACK, board)
 
+    def stop_pondering(self, *strategies):
+        """Stop the background search of any strategy that ponders (see `othello_ponder`)."""
+        for strategy in strategies:
+            stop = getattr(strategy, 'stop_pondering', None)
+            if stop is not None:
+                stop()
+
 
     def next_player(self,board, prev_player):
         """Which player should move next?  Returns None if no legal moves exist."""
@@ -1,20 +1,54 @@
 import othello_base as ob
-import pygame
+import queue
+import threading
 import time
 
+# pygame is imported by the first OthelloGUI made, not by importing this
+# module, so that importing the engines built on OthelloGUI costs nothing
+# for programs that never open a window.
+pygame = None
+
+
+def load_pygame():
+    """Import pygame, once, into this module's namespace."""
+    global pygame
+    if pygame is None:
+        import pygame as module
+        pygame = module
+    return pygame
+
 BOARD_X0 = 290
 BOARD_Y0 = 10
 SQUARE_WIDTH = 70
 
+# How often the window is redrawn (and its events handled) while a strategy
+# is thinking, and how long to wait for a cancelled search to stop.
+FRAME_RATE = 30
+CANCEL_WAIT = 1.0
+
+# How long a placed disc takes to grow to full size.
+ANIMATION_SECONDS = 0.2
+
+# Rendered texts kept; the cache starts over when it fills up, since the
+# search statistics and timings are different every time.
+TEXT_CACHE_SIZE = 256
+
 
 class OthelloGUI(ob.OthelloBase):
 
+    # Set to make the search running on the worker thread give up; it is
+    # checked every time legal moves are generated.
+    cancel_search = False
+
     def __init__(self):
+        load_pygame()
         pygame.mixer.pre_init(44100, -16, 2, 2048)
         pygame.init()
         self.screen = pygame.display.set_mode((1280, 720))
 
-        self.board_image = pygame.image.load("othello.png")
+        # Images are converted to the display format once, and the growing disc
+        # of the move animation is pre-scaled to each of its sizes.
+        self.board_image = pygame.image.load("othello.png").convert()
         black_piece_image = pygame.image.load("square-black.png").convert()
         black_piece_images = [pygame.transform.scale(black_piece_image, (10 + 10 * i, 10 + 10 * i)) for i in range(7)]
         white_piece_image = pygame.image.load("square-white.png").convert()
@@ -29,6 +63,24 @@ class OthelloGUI(ob.OthelloBase):
 
         self.score_font = pygame.font.SysFont("charter", size=60, bold=True)
         self.name_font = pygame.font.SysFont("charter", size=30, bold=False)
+        self.stats_font = pygame.font.SysFont("charter", size=16, bold=False)
+        # Rendered text, by (text, font): scores and names come up again and again.
+        self.text_cache = {}
+
+        # Drawing only marks the parts of the screen it changed; `present`
+        # pushes them all to the display in one update.
+        self.dirty = []
+        self.clock = pygame.time.Clock()
+
+    def mark_dirty(self, rect):
+        """Note that a part of the screen has been drawn on."""
+        self.dirty.append(pygame.Rect(rect))
+
+    def present(self):
+        """Update the parts of the display drawn on since the last call."""
+        if self.dirty:
+            pygame.display.update(self.dirty)
+            self.dirty = []
 
     def idx2rc(self, idx):
         return(idx//10, idx%10)
@@ -37,13 +89,27 @@ class OthelloGUI(ob.OthelloBase):
         (row, col) = self.idx2rc(move)
         putX = BOARD_X0 + col * SQUARE_WIDTH
         putY = BOARD_Y0 + row * SQUARE_WIDTH
+        images = self.player_images[player]
         if animate:
-            for (d,img) in zip(range(30,-1,-5),self.player_images[player]):
-                self.screen.blit(img, (putX+d, putY+d, SQUARE_WIDTH-2*d, SQUARE_WIDTH-2*d))
-                pygame.display.update(pygame.Rect(putX, putY, SQUARE_WIDTH-2*d, SQUARE_WIDTH-2*d))
+            # Each frame shows the disc at the size it has reached by then, so
+            # the animation takes ANIMATION_SECONDS however fast the machine.
+            start = time.time()
+            shown = -1
+            while shown < len(images) - 1:
+                step = min(len(images) - 1,
+                           int((time.time() - start) * len(images) / ANIMATION_SECONDS))
+                if step > shown:
+                    img = images[step]
+                    d = (SQUARE_WIDTH - img.get_width()) // 2
+                    self.screen.blit(img, (putX + d, putY + d))
+                    self.mark_dirty((putX + d, putY + d, img.get_width(), img.get_height()))
+                    self.present()
+                    shown = step
+                self.clock.tick(FRAME_RATE)
         else:
-            self.screen.blit(self.player_images[player][-1], (putX, putY, SQUARE_WIDTH, SQUARE_WIDTH))
-            pygame.display.flip()
+            self.screen.blit(images[-1], (putX, putY, SQUARE_WIDTH, SQUARE_WIDTH))
+            self.mark_dirty((putX, putY, SQUARE_WIDTH, SQUARE_WIDTH))
+            self.present()
 
     def draw_flip(self, move: object, player: object, board: object, update_screen = True) -> object:
         (row, col) = self.idx2rc(move)
@@ -52,8 +118,9 @@ class OthelloGUI(ob.OthelloBase):
 
         img = self.player_images[player][-1]
         self.screen.blit(img, (putX, putY, SQUARE_WIDTH, SQUARE_WIDTH))
+        self.mark_dirty((putX, putY, SQUARE_WIDTH, SQUARE_WIDTH))
         if update_screen:
-            pygame.display.update(pygame.Rect(putX, putY, SQUARE_WIDTH, SQUARE_WIDTH))
+            self.present()
 
     def make_move(self, move, player, board, silent = True):
         """Update the board to reflect the move by the specified player."""
@@ -63,6 +130,9 @@ class OthelloGUI(ob.OthelloBase):
             self.player_sounds[player].play()
         for d in ob.DIRECTIONS:
             self.make_flips(move, player, board, d, silent)
+        if not silent:
+            # All the flipped discs appear in one update.
+            self.present()
         return board
 
     def make_flips(self, move, player, board, direction, silent = True):
@@ -74,7 +144,7 @@ class OthelloGUI(ob.OthelloBase):
         while square != bracket:
             board[square] = player
             if not silent:
-                self.draw_flip(square, player, board)
+                self.draw_flip(square, player, board, update_screen=False)
                 self.flip_sound.play()
             square += direction
             #print(direction, player, move)
@@ -89,7 +159,12 @@ class OthelloGUI(ob.OthelloBase):
         return self.count_up(board, ob.WHITE)
 
     def text_objects(self, text, font):
-        textSurface = font.render(text, True, (255, 255, 240))
+        textSurface = self.text_cache.get((text, font))
+        if textSurface is None:
+            if len(self.text_cache) >= TEXT_CACHE_SIZE:
+                self.text_cache.clear()
+            textSurface = font.render(text, True, (255, 255, 240))
+            self.text_cache[text, font] = textSurface
         return textSurface, textSurface.get_rect()
 
     def update_score(self, board):
@@ -99,12 +174,14 @@ class OthelloGUI(ob.OthelloBase):
         rect_w.midtop = 1090, 150
         # pygame.draw.rect(screen, (180, 180, 180), rect_b)
         # pygame.draw.rect(screen, (180, 180, 180), rect_w)
-        self.screen.blit(self.board_image, (140, 70), (140, 70, 100, 150))
-        self.screen.blit(self.board_image, (140, 70), (140, 70, 100, 150))
-        self.screen.blit(self.board_image, (1050, 70), (1050, 70, 100, 150))
+        for area in ((140, 70, 100, 150), (1050, 70, 100, 150)):
+            self.screen.blit(self.board_image, area[:2], area)
+            self.mark_dirty(area)
         self.screen.blit(score_w, rect_w)
         self.screen.blit(score_b, rect_b)
-        pygame.display.flip()
+        self.mark_dirty(rect_w)
+        self.mark_dirty(rect_b)
+        self.present()
 
     def show_player_names(self, black = "Black", white = "White"):
         name_b, rect_b = self.text_objects(black, self.name_font)
@@ -114,6 +191,23 @@ class OthelloGUI(ob.OthelloBase):
         self.screen.blit(name_w, rect_w)
         self.screen.blit(name_b, rect_b)
 
+    def show_stats(self, stats, player):
+        """Show a summary of a player's last search under their score."""
+        x = 190 if player == ob.BLACK else 1090
+        self.screen.blit(self.board_image, (x - 140, 240), (x - 140, 240, 280, 140))
+        total = sum(stats.nodes)
+        lines = ['depth %d' % stats.iterations[-1][0] if stats.iterations else '',
+                 '%d nodes, %.2f s' % (total, stats.elapsed),
+                 '%.0f nodes/s' % (total / stats.elapsed if stats.elapsed else 0),
+                 'table hits %.0f%%' % (100 * stats.hit_rate()),
+                 'pv ' + ' '.join(map(str, stats.pv[:6]))]
+        for i, line in enumerate(lines):
+            text, rect = self.text_objects(line, self.stats_font)
+            rect.midtop = x, 240 + 24 * i
+            self.screen.blit(text, rect)
+        self.mark_dirty((x - 140, 240, 280, 140))
+        self.present()
+
     def post_winner(self, winner):
         if winner=="Tie":
             winner = "Tie Game!"
@@ -122,7 +216,8 @@ class OthelloGUI(ob.OthelloBase):
         text, rect = self.text_objects(winner, self.name_font)
         rect.bottomright = 1260, 700
         self.screen.blit(text, rect)
-        pygame.display.flip()
+        self.mark_dirty(rect)
+        self.present()
 
     def setup_board(self, board, black_name, white_name):
         imagerect = self.board_image.get_rect()
@@ -133,9 +228,83 @@ class OthelloGUI(ob.OthelloBase):
         self.draw_flip(45, ob.BLACK, board, update_screen=False)
         self.draw_flip(54, ob.BLACK, board, update_screen=False)
         self.show_player_names(black_name, white_name)
+        self.dirty = []
         pygame.display.flip()
 
 
+    # A strategy can think for many seconds.  Calling it on the main thread
+    # would leave the window unresponsive all that time, so `think` runs it
+    # on a worker thread and keeps handling events and redrawing until its
+    # move arrives on a queue.  Closing the window cancels the search: the
+    # next time it generates moves it raises `SearchCancelled`.  (Searches
+    # that never call `legal_moves`, such as the bitboard endgame solver,
+    # cannot be interrupted, but the worker is a daemon thread and does not
+    # keep the program alive.)
+
+    def legal_moves(self, player, board):
+        """Get a list of all legal moves for player."""
+        if self.cancel_search:
+            raise self.SearchCancelled()
+        return super().legal_moves(player, board)
+
+    def think(self, strategy, player, board):
+        """
+        Get player's move from strategy on a worker thread, handling events and
+        redrawing at FRAME_RATE meanwhile.  Raises WindowClosed if the window is
+        closed first.
+        """
+        results = queue.Queue()
+
+        def search():
+            try:
+                results.put((self.get_move(strategy, player, board), None))
+            except Exception as error:
+                results.put((None, error))
+
+        self.cancel_search = False
+        worker = threading.Thread(target=search, name='othello-search', daemon=True)
+        worker.start()
+        clock = pygame.time.Clock()
+        start = time.time()
+        while True:
+            if self.window_closed():
+                self.cancel_search = True
+                worker.join(CANCEL_WAIT)
+                pygame.quit()
+                raise self.WindowClosed()
+            try:
+                move, error = results.get_nowait()
+            except queue.Empty:
+                self.show_thinking(player, time.time() - start)
+                clock.tick(FRAME_RATE)
+                continue
+            self.show_thinking(player, None)
+            if error is not None:
+                raise error
+            return move
+
+    def window_closed(self):
+        """Handle the pending events; True if one of them closed the window."""
+        closed = False
+        for event in pygame.event.get():
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                mousepos = pygame.mouse.get_pos()
+            elif event.type == pygame.QUIT:
+                closed = True
+        return closed
+
+    def show_thinking(self, player, seconds):
+        """Show how long player has been thinking, or clear it (seconds=None)."""
+        x = 190 if player == ob.BLACK else 1090
+        area = pygame.Rect(x - 140, 212, 280, 24)
+        self.screen.blit(self.board_image, area, area)
+        if seconds is not None:
+            text, rect = self.text_objects('thinking %.1f s' % seconds, self.stats_font)
+            rect.midtop = x, 214
+            self.screen.blit(text, rect)
+        self.mark_dirty(area)
+        self.present()
+
     def play(self, black_strategy, white_strategy, black_name, white_name):
         """Play a game of Othello and return the final board and score."""
         board = self.initial_board()
@@ -144,18 +313,18 @@ class OthelloGUI(ob.OthelloBase):
 
         player = ob.BLACK
         strategy = lambda who: black_strategy if who == ob.BLACK else white_strategy
-        while player is not None:
-            for event in pygame.event.get():
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    mousepos = pygame.mouse.get_pos()
-                elif event.type == pygame.QUIT:
-                    pygame.quit()
-                    break
-            move = self.get_move(strategy(player), player, board)
-            self.make_move(move, player, board, silent = False)
-            self.update_score(board)
-            # print(self.print_board(board))
-            player = self.next_player(board, player)
+        try:
+            while player is not None:
+                move = self.think(strategy(player), player, board)
+                self.make_move(move, player, board, silent = False)
+                self.update_score(board)
+                stats = getattr(strategy(player), 'stats', None)
+                if stats is not None:
+                    self.show_stats(stats, player)
+                # print(self.print_board(board))
+                player = self.next_player(board, player)
+        finally:
+            self.stop_pondering(black_strategy, white_strategy)
 
         black_score = self.score(ob.BLACK, board)
         if black_score > 0:
@@ -0,0 +1,499 @@
+"""
+A bitboard engine for Othello.
+
+The list board in `othello_base` is easy to read, but every legal move check
+walks the board one square at a time.  Here a position is stored as two 64-bit
+integers--one bit per square for each side--and move generation and flipping
+are done for all squares at once with shifts and masks.
+
+The gain only lasts while the position stays in bitboards: packing a list
+board is a loop over all 64 squares, as slow as a list engine's move
+generation.  So a `BitBoard` keeps a position as Black's and White's bitboards,
+and `BitboardMixin` generates, makes (`do_move`) and takes back (`undo_move`)
+moves on it without ever unpacking it.  The searchers of an engine with the
+mixin convert the list board they are handed once, at the root (see
+`search_board`), and search the `BitBoard` below it; `othello_v0001`'s
+searchers run on it unchanged:
+
+    class BitboardEngine(BitboardMixin, othello_v0001.Strategies):
+        pass
+
+(which is `othello_v0001.BitboardEngine`).  Boards outside a search stay lists,
+and the mixin passes them on to the list engine it is mixed into.  A
+`BitBoard` also reads like a list board--`board[sq]`, slices,
+`board.count(EMPTY)`--so code written for lists, such as the evaluations in
+`othello_eval`, works on it too, only without the speed.
+
+`othello_paip`'s searchers call that module's free functions, not methods of
+an engine, so they stay on list boards.
+
+`to_bitboards`, `legal_bits` and `flip_bits` are also used on their own by
+searches that work on (own, opp) pairs directly: the endgame solver
+(`othello_endgame`) and `othello_perft.perft_bits`.
+"""
+
+import operator
+
+import othello_base as ob
+import othello_tables as tables
+import othello_tt as tt
+
+# -----------------------------------------------------------------------------
+## Bit layout
+
+# Bit 0 is square 11 (top left) and bit 63 is square 88 (bottom right), so
+# moving one square right is a shift by 1 and one square down a shift by 8.
+FULL = (1 << 64) - 1
+SQUARE_TO_BIT = {}
+BIT_TO_SQUARE = [0] * 64
+for _row in range(8):
+    for _col in range(8):
+        SQUARE_TO_BIT[10 * (_row + 1) + _col + 1] = _row * 8 + _col
+        BIT_TO_SQUARE[_row * 8 + _col] = 10 * (_row + 1) + _col + 1
+SQUARE_BITS = tuple((sq, 1 << bit) for sq, bit in SQUARE_TO_BIT.items())
+
+# Shifting right or left wraps pieces onto the next row; these masks clear the
+# column that a wrapped piece would land in.
+NOT_A_FILE = 0xfefefefefefefefe     # everything but column 1
+NOT_H_FILE = 0x7f7f7f7f7f7f7f7f     # everything but column 8
+INNER_FILES = NOT_A_FILE & NOT_H_FILE
+
+# Each direction is (shift, mask): positive shifts move towards bit 63.
+SHIFTS = {ob.RIGHT: (1, NOT_A_FILE),
+          ob.LEFT: (-1, NOT_H_FILE),
+          ob.DOWN: (8, FULL),
+          ob.UP: (-8, FULL),
+          ob.DOWN_RIGHT: (9, NOT_A_FILE),
+          ob.DOWN_LEFT: (7, NOT_H_FILE),
+          ob.UP_RIGHT: (-7, NOT_A_FILE),
+          ob.UP_LEFT: (-9, NOT_H_FILE)}
+DIRECTION_SHIFTS = tuple(SHIFTS[d] for d in ob.DIRECTIONS)
+
+
+def row_tables(value, combine, start):
+    """
+    Tables T with T[r][byte] the `value`s of the squares of row r whose bits
+    are set in byte, folded together with `combine` from `start`, so that a
+    function of a whole bitboard is eight lookups, one per byte.
+    """
+    tables = []
+    for row in range(8):
+        table = []
+        for byte in range(256):
+            total = start
+            for col in range(8):
+                if byte >> col & 1:
+                    total = combine(total, value(BIT_TO_SQUARE[8 * row + col]))
+            table.append(total)
+        tables.append(table)
+    return tables
+
+
+# -----------------------------------------------------------------------------
+## Conversion
+
+def to_bitboards(player, board):
+    """Pack a list board (or take a `BitBoard`) into (own, opp) bitboards from player's side."""
+    if type(board) is BitBoard:
+        return (board.black, board.white) if player == ob.BLACK else (board.white, board.black)
+    own = opp = 0
+    for sq, bit in SQUARE_BITS:
+        piece = board[sq]
+        if piece == player:
+            own |= bit
+        elif piece != ob.EMPTY:
+            opp |= bit
+    return own, opp
+
+
+ROW_SQUARES = row_tables(lambda sq: [sq], operator.add, [])
+
+
+def squares_of(bits):
+    """List the board squares (in index order) whose bits are set."""
+    squares = []
+    for table in ROW_SQUARES:
+        if not bits:
+            break
+        if bits & 255:
+            squares += table[bits & 255]
+        bits >>= 8
+    return squares
+
+
+def popcount(bits):
+    """Count the set bits."""
+    return bin(bits).count('1')
+
+
+# -----------------------------------------------------------------------------
+## Move generation
+
+# A move is legal in a direction when it is followed by a run of opponent
+# pieces ending at one of our own.  Starting from our pieces and growing the
+# run through opponent pieces six times covers the longest possible line; one
+# more step onto an empty square gives the moves in that direction.
+#
+# The eight directions are written out: a loop over `DIRECTION_SHIFTS` costs
+# about a third of the time in the loop itself.  A run that goes sideways or
+# diagonally can only pass through the inner six columns, so masking the
+# opponent's pieces with `INNER_FILES` once also stops every shift that would
+# wrap round onto the next row.  Bits shifted past bit 63 are cleared by the
+# final `& empty`.
+
+def legal_bits(own, opp):
+    """Bitboard of all legal moves for the side owning `own`."""
+    empty = ~(own | opp) & FULL
+    inner = opp & INNER_FILES
+    # Right and left.
+    run = (own << 1) & inner
+    run |= (run << 1) & inner
+    run |= (run << 1) & inner
+    run |= (run << 1) & inner
+    run |= (run << 1) & inner
+    run |= (run << 1) & inner
+    moves = run << 1
+    run = (own >> 1) & inner
+    run |= (run >> 1) & inner
+    run |= (run >> 1) & inner
+    run |= (run >> 1) & inner
+    run |= (run >> 1) & inner
+    run |= (run >> 1) & inner
+    moves |= run >> 1
+    # Down and up.
+    run = (own << 8) & opp
+    run |= (run << 8) & opp
+    run |= (run << 8) & opp
+    run |= (run << 8) & opp
+    run |= (run << 8) & opp
+    run |= (run << 8) & opp
+    moves |= run << 8
+    run = (own >> 8) & opp
+    run |= (run >> 8) & opp
+    run |= (run >> 8) & opp
+    run |= (run >> 8) & opp
+    run |= (run >> 8) & opp
+    run |= (run >> 8) & opp
+    moves |= run >> 8
+    # Down-right and up-left.
+    run = (own << 9) & inner
+    run |= (run << 9) & inner
+    run |= (run << 9) & inner
+    run |= (run << 9) & inner
+    run |= (run << 9) & inner
+    run |= (run << 9) & inner
+    moves |= run << 9
+    run = (own >> 9) & inner
+    run |= (run >> 9) & inner
+    run |= (run >> 9) & inner
+    run |= (run >> 9) & inner
+    run |= (run >> 9) & inner
+    run |= (run >> 9) & inner
+    moves |= run >> 9
+    # Down-left and up-right.
+    run = (own << 7) & inner
+    run |= (run << 7) & inner
+    run |= (run << 7) & inner
+    run |= (run << 7) & inner
+    run |= (run << 7) & inner
+    run |= (run << 7) & inner
+    moves |= run << 7
+    run = (own >> 7) & inner
+    run |= (run >> 7) & inner
+    run |= (run >> 7) & inner
+    run |= (run >> 7) & inner
+    run |= (run >> 7) & inner
+    run |= (run >> 7) & inner
+    moves |= run >> 7
+    return moves & empty
+
+
+def flip_bits(move_bit, own, opp):
+    """Bitboard of the opponent pieces flipped by playing `move_bit`."""
+    # The same runs as in `legal_bits`, grown from the move instead of from
+    # our pieces; a run flips if the square past its end is ours.  Most
+    # directions have no opponent piece next to the move and stop at once.
+    inner = opp & INNER_FILES
+    flips = 0
+    # Right and left.
+    run = (move_bit << 1) & inner
+    if run:
+        run |= (run << 1) & inner
+        run |= (run << 1) & inner
+        run |= (run << 1) & inner
+        run |= (run << 1) & inner
+        run |= (run << 1) & inner
+        if (run << 1) & own:
+            flips = run
+    run = (move_bit >> 1) & inner
+    if run:
+        run |= (run >> 1) & inner
+        run |= (run >> 1) & inner
+        run |= (run >> 1) & inner
+        run |= (run >> 1) & inner
+        run |= (run >> 1) & inner
+        if (run >> 1) & own:
+            flips |= run
+    # Down and up.
+    run = (move_bit << 8) & opp
+    if run:
+        run |= (run << 8) & opp
+        run |= (run << 8) & opp
+        run |= (run << 8) & opp
+        run |= (run << 8) & opp
+        run |= (run << 8) & opp
+        if (run << 8) & own:
+            flips |= run
+    run = (move_bit >> 8) & opp
+    if run:
+        run |= (run >> 8) & opp
+        run |= (run >> 8) & opp
+        run |= (run >> 8) & opp
+        run |= (run >> 8) & opp
+        run |= (run >> 8) & opp
+        if (run >> 8) & own:
+            flips |= run
+    # Down-right and up-left.
+    run = (move_bit << 9) & inner
+    if run:
+        run |= (run << 9) & inner
+        run |= (run << 9) & inner
+        run |= (run << 9) & inner
+        run |= (run << 9) & inner
+        run |= (run << 9) & inner
+        if (run << 9) & own:
+            flips |= run
+    run = (move_bit >> 9) & inner
+    if run:
+        run |= (run >> 9) & inner
+        run |= (run >> 9) & inner
+        run |= (run >> 9) & inner
+        run |= (run >> 9) & inner
+        run |= (run >> 9) & inner
+        if (run >> 9) & own:
+            flips |= run
+    # Down-left and up-right.
+    run = (move_bit << 7) & inner
+    if run:
+        run |= (run << 7) & inner
+        run |= (run << 7) & inner
+        run |= (run << 7) & inner
+        run |= (run << 7) & inner
+        run |= (run << 7) & inner
+        if (run << 7) & own:
+            flips |= run
+    run = (move_bit >> 7) & inner
+    if run:
+        run |= (run >> 7) & inner
+        run |= (run >> 7) & inner
+        run |= (run >> 7) & inner
+        run |= (run >> 7) & inner
+        run |= (run >> 7) & inner
+        if (run >> 7) & own:
+            flips |= run
+    return flips
+
+
+# -----------------------------------------------------------------------------
+## Positions
+
+# The bit of each list board square, 0 for the squares off the board.
+SQUARE_BIT = [0] * 100
+for _sq, _bit in SQUARE_BITS:
+    SQUARE_BIT[_sq] = _bit
+
+
+class BitBoard:
+    """A position as Black's and White's bitboards, standing in for a list board."""
+
+    __slots__ = ('black', 'white')
+
+    def __init__(self, black, white):
+        self.black = black
+        self.white = white
+
+    @classmethod
+    def from_list(cls, board):
+        """The position of a list board."""
+        return cls(*to_bitboards(ob.BLACK, board))
+
+    def copy(self):
+        return BitBoard(self.black, self.white)
+
+    def to_list(self):
+        """The position as a list board."""
+        board = [ob.OUTER] * 100
+        for sq, bit in SQUARE_BITS:
+            board[sq] = (ob.BLACK if self.black & bit else
+                         ob.WHITE if self.white & bit else ob.EMPTY)
+        return board
+
+    # Enough of the list interface for code that reads a board square by
+    # square; `list(board)` makes a list board of it.
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.to_list()[index]
+        bit = SQUARE_BIT[index]
+        if not bit:
+            return ob.OUTER
+        return ob.BLACK if self.black & bit else ob.WHITE if self.white & bit else ob.EMPTY
+
+    def __len__(self):
+        return 100
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def count(self, piece):
+        """The number of squares holding piece, as `list.count` would give."""
+        if piece == ob.EMPTY:
+            return 64 - popcount(self.black | self.white)
+        if piece == ob.BLACK:
+            return popcount(self.black)
+        if piece == ob.WHITE:
+            return popcount(self.white)
+        return 36 if piece == ob.OUTER else 0
+
+
+# -----------------------------------------------------------------------------
+## The OthelloBase interface
+
+# Square weights and Zobrist keys by the byte: the weight of a bitboard is
+# the sum of eight `ROW_WEIGHTS` entries, its key the XOR of eight `ROW_KEYS`
+# entries--the same keys `othello_tt.zobrist_key` gives a list board.
+ROW_WEIGHTS = row_tables(tables.SQUARE_WEIGHTS.__getitem__, operator.add, 0)
+ROW_KEYS = {piece: row_tables(tt.ZOBRIST[piece].__getitem__, operator.xor, 0)
+            for piece in (ob.BLACK, ob.WHITE)}
+ROW_FLIP_KEYS = row_tables(tt.ZOBRIST_FLIP.__getitem__, operator.xor, 0)
+
+
+def weight(bits):
+    """The `SQUARE_WEIGHTS` total of the squares of a bitboard."""
+    w0, w1, w2, w3, w4, w5, w6, w7 = ROW_WEIGHTS
+    return (w0[bits & 255] + w1[bits >> 8 & 255] + w2[bits >> 16 & 255]
+            + w3[bits >> 24 & 255] + w4[bits >> 32 & 255] + w5[bits >> 40 & 255]
+            + w6[bits >> 48 & 255] + w7[bits >> 56])
+
+
+def row_key(rows, bits):
+    """The XOR of the keys, from `ROW_KEYS` or `ROW_FLIP_KEYS`, of the squares of a bitboard."""
+    k0, k1, k2, k3, k4, k5, k6, k7 = rows
+    return (k0[bits & 255] ^ k1[bits >> 8 & 255] ^ k2[bits >> 16 & 255]
+            ^ k3[bits >> 24 & 255] ^ k4[bits >> 32 & 255] ^ k5[bits >> 40 & 255]
+            ^ k6[bits >> 48 & 255] ^ k7[bits >> 56])
+
+
+class BitboardMixin:
+    """
+    Search on `BitBoard`s: each method has a bitboard path for them, and
+    passes list boards on to the class this is mixed into.
+    """
+
+    def search_board(self, board):
+        """The board a search from `board` works on: a `BitBoard`."""
+        return board if type(board) is BitBoard else BitBoard.from_list(board)
+
+    def is_legal(self, move, player, board):
+        """Is this a legal move for the player?"""
+        if type(board) is not BitBoard:
+            return super().is_legal(move, player, board)
+        bit = SQUARE_BIT[move]
+        if not bit or (board.black | board.white) & bit:
+            return False
+        if player == ob.BLACK:
+            return bool(flip_bits(bit, board.black, board.white))
+        return bool(flip_bits(bit, board.white, board.black))
+
+    def legal_moves(self, player, board):
+        """Get a list of all legal moves for player."""
+        if type(board) is not BitBoard:
+            return super().legal_moves(player, board)
+        if player == ob.BLACK:
+            return squares_of(legal_bits(board.black, board.white))
+        return squares_of(legal_bits(board.white, board.black))
+
+    def any_legal_move(self, player, board):
+        """Can player make any moves?"""
+        if type(board) is not BitBoard:
+            return super().any_legal_move(player, board)
+        if player == ob.BLACK:
+            return legal_bits(board.black, board.white) != 0
+        return legal_bits(board.white, board.black) != 0
+
+    def make_move(self, move, player, board, *args, **kwargs):
+        """Update the board to reflect the move by the specified player."""
+        if type(board) is not BitBoard:
+            return super().make_move(move, player, board, *args, **kwargs)
+        self.do_move(move, player, board)
+        return board
+
+    def find_flips(self, move, player, board):
+        """List the squares that would flip if player made the move."""
+        if type(board) is not BitBoard:
+            return super().find_flips(move, player, board)
+        own, opp = to_bitboards(player, board)
+        return squares_of(flip_bits(SQUARE_BIT[move], own, opp))
+
+    # On a `BitBoard` the flips are a bitboard rather than a list of squares.
+
+    def do_move(self, move, player, board):
+        """Make the move in place and return the squares it flipped."""
+        if type(board) is not BitBoard:
+            return super().do_move(move, player, board)
+        bit = SQUARE_BIT[move]
+        if player == ob.BLACK:
+            flips = flip_bits(bit, board.black, board.white)
+            board.black |= bit | flips
+            board.white ^= flips
+        else:
+            flips = flip_bits(bit, board.white, board.black)
+            board.white |= bit | flips
+            board.black ^= flips
+        return flips
+
+    def undo_move(self, move, player, board, flips):
+        """Take back a move made by `do_move`, given the squares it flipped."""
+        if type(board) is not BitBoard:
+            return super().undo_move(move, player, board, flips)
+        if player == ob.BLACK:
+            board.black ^= SQUARE_BIT[move] | flips
+            board.white |= flips
+        else:
+            board.white ^= SQUARE_BIT[move] | flips
+            board.black |= flips
+
+    def score(self, player, board):
+        """Compute player's score (number of player's pieces minus opponent's)."""
+        if type(board) is not BitBoard:
+            return super().score(player, board)
+        if player == ob.BLACK:
+            return popcount(board.black) - popcount(board.white)
+        return popcount(board.white) - popcount(board.black)
+
+    def weighted_score(self, player, board):
+        """The `SQUARE_WEIGHTS` total of player's squares less the opponent's."""
+        if type(board) is not BitBoard:
+            return super().weighted_score(player, board)
+        if player == ob.BLACK:
+            return weight(board.black) - weight(board.white)
+        return weight(board.white) - weight(board.black)
+
+    def zobrist_key(self, player, board):
+        """The key of a board with player to move, computed from scratch."""
+        if type(board) is not BitBoard:
+            return super().zobrist_key(player, board)
+        key = tt.ZOBRIST_WHITE_TO_MOVE if player == ob.WHITE else 0
+        return (key ^ row_key(ROW_KEYS[ob.BLACK], board.black)
+                ^ row_key(ROW_KEYS[ob.WHITE], board.white))
+
+    def move_key(self, key, move, player, flips):
+        """The key after a move, or None when no key is being tracked."""
+        if key is None or not isinstance(flips, int):
+            return super().move_key(key, move, player, flips)
+        return (key ^ tt.ZOBRIST[player][move] ^ tt.ZOBRIST_WHITE_TO_MOVE
+                ^ row_key(ROW_FLIP_KEYS, flips))
+
+
+class OthelloBitboard(BitboardMixin, ob.OthelloBase):
+    """The plain game, on `BitBoard`s when given them."""
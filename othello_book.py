@@ -0,0 +1,210 @@
+"""
+An opening book: what was played from each early position, and how it went.
+
+The first moves of every game are searched from scratch although the same few
+positions come up again and again.  A book built from earlier games answers
+them at once: for each position it lists the moves played, how many games
+played each, and the mean final disc difference they led to.
+
+Positions are keyed by their canonical form over the eight symmetries of the
+board (see `othello_symmetry`), so a position and its mirror images share one
+entry and moves are stored in the canonical frame.  In a symmetric position
+(the start, say) moves that are images of each other are counted as one.
+
+The book is a file of fixed-size records sorted by position, after an 8-byte
+header; a position's moves are consecutive records.  `OpeningBook` maps the
+file into memory and binary-searches it, so opening a book reads nothing and a
+lookup touches only a few pages.
+
+    python othello_book.py build games.jsonl openings.txt --out othello_book.bin
+    python othello_book.py show othello_book.bin f5d6
+
+Games come from tournament or self-play records (JSON lines with a `moves`
+string of two-digit squares) or transcripts in the usual notation, one game
+per line (`f5d6c3...`).
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+
+import othello_base as base
+from othello_bitboard import FULL
+import othello_symmetry as symmetry
+
+MAGIC = b'OTHBOOK1'
+# Own and opponent bitboards (big-endian, so records sort bytewise), the move,
+# padding, the number of games and the sum of their final disc differences.
+RECORD = struct.Struct('>QQB3xIi')
+KEY_SIZE = 16
+
+# Only positions this many plies into the game go in the book, and by default
+# it is only consulted that far in.
+BOOK_PLIES = 20
+
+# -----------------------------------------------------------------------------
+## Building
+
+def parse_transcript(line):
+    """The squares of a transcript such as 'f5d6c3'."""
+    line = line.strip().lower()
+    return [10 * int(line[i + 1]) + ord(line[i]) - ord('a') + 1 for i in range(0, len(line), 2)]
+
+
+def read_games(path):
+    """Yield (moves, final score for Black) for the complete games in a file."""
+    engine = base.OthelloBase()
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('{'):
+                record = json.loads(line)
+                if 'illegal' in record:
+                    continue
+                moves = [int(record['moves'][i:i + 2])
+                         for i in range(0, len(record['moves']), 2)]
+            else:
+                moves = parse_transcript(line)
+            board, player = engine.initial_board(), base.BLACK
+            for move in moves:
+                if player is None or not engine.is_legal(move, player, board):
+                    break
+                engine.make_move(move, player, board)
+                player = engine.next_player(board, player)
+            else:
+                if player is None:
+                    yield moves, engine.score(base.BLACK, board)
+
+
+def build(paths, out_path, plies=BOOK_PLIES, min_games=1):
+    """
+    Write a book of the first `plies` moves of the games in paths, keeping the
+    moves played in at least `min_games` games; return how many it kept.
+    """
+    engine = base.OthelloBase()
+    counts = {}
+    for path in paths:
+        for moves, score in read_games(path):
+            board, player = engine.initial_board(), base.BLACK
+            for move in moves[:plies]:
+                key, symmetries = symmetry.canonical_board(player, board)
+                entry = counts.setdefault((key, symmetry.canonical_move(move, symmetries)),
+                                          [0, 0])
+                entry[0] += 1
+                entry[1] += score if player == base.BLACK else -score
+                engine.make_move(move, player, board)
+                player = engine.next_player(board, player)
+    entries = sorted((key, move, games, total) for (key, move), (games, total) in counts.items()
+                     if games >= min_games)
+    with open(out_path, 'wb') as out:
+        out.write(MAGIC)
+        for key, move, games, total in entries:
+            out.write(RECORD.pack(key >> 64, key & FULL, move, games, total))
+    return len(entries)
+
+
+# -----------------------------------------------------------------------------
+## Lookup
+
+# Where `default_book` looks for a book.
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'othello_book.bin')
+
+
+def default_book():
+    """BOOK_PATH if there is a book there, otherwise None (an empty book)."""
+    return BOOK_PATH if os.path.exists(BOOK_PATH) else None
+
+
+class OpeningBook:
+    """A book file mapped into memory; with path=None, a book with no entries."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.data, self.count = b'', 0
+        if path is None:
+            return
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < len(MAGIC) or (size - len(MAGIC)) % RECORD.size:
+                raise ValueError('%s is not an opening book' % path)
+            if size > len(MAGIC):
+                self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data and self.data[:len(MAGIC)] != MAGIC:
+            raise ValueError('%s is not an opening book' % path)
+        self.count = (size - len(MAGIC)) // RECORD.size
+
+    def first_record(self, key):
+        """The number of the first record whose position is not below key."""
+        data, lo, hi = self.data, 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = len(MAGIC) + mid * RECORD.size
+            if data[start:start + KEY_SIZE] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def lookup(self, player, board):
+        """The (move, games, mean disc difference) of each book move from a position."""
+        if not self.count:
+            return []
+        key, symmetries = symmetry.canonical_board(player, board)
+        own, opp = key >> 64, key & FULL
+        moves = []
+        for number in range(self.first_record(key.to_bytes(KEY_SIZE, 'big')), self.count):
+            own_, opp_, move, games, total = RECORD.unpack_from(
+                self.data, len(MAGIC) + number * RECORD.size)
+            if (own_, opp_) != (own, opp):
+                break
+            moves.append((symmetry.original_move(move, symmetries), games, total / games))
+        return moves
+
+    def choose(self, player, board, rng, randomness=0.0, min_games=1):
+        """
+        A book move for player, or None: among the moves played in at least
+        `min_games` games, one whose mean result is within `randomness` discs
+        of the best, picked at random.
+        """
+        moves = [m for m in self.lookup(player, board) if m[1] >= min_games]
+        if not moves:
+            return None
+        best = max(mean for _, _, mean in moves)
+        return rng.choice(sorted(move for move, _, mean in moves if mean >= best - randomness))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or inspect an Othello opening book.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build_parser = commands.add_parser('build', help='build a book from games')
+    build_parser.add_argument('games', nargs='+',
+                              help='game records (JSON lines) or transcripts (f5d6...)')
+    build_parser.add_argument('--plies', type=int, default=BOOK_PLIES)
+    build_parser.add_argument('--min-games', type=int, default=1)
+    build_parser.add_argument('--out', default='othello_book.bin')
+    show = commands.add_parser('show', help='list the book moves after a transcript')
+    show.add_argument('book')
+    show.add_argument('moves', nargs='?', default='')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        kept = build(args.games, args.out, args.plies, args.min_games)
+        print('%d book moves written to %s' % (kept, args.out))
+        return
+    engine, book = base.OthelloBase(), OpeningBook(args.book)
+    board, player = engine.initial_board(), base.BLACK
+    for move in parse_transcript(args.moves):
+        engine.make_move(move, player, board)
+        player = engine.next_player(board, player)
+    print(engine.print_board(board))
+    for move, games, mean in sorted(book.lookup(player, board), key=lambda m: -m[1]):
+        print('%s  %6d games  %+6.2f' % ('abcdefgh'[move % 10 - 1] + str(move // 10),
+                                         games, mean))
+
+
+if __name__ == "__main__":
+    main()
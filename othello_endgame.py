@@ -0,0 +1,168 @@
+"""
+An exact endgame solver.
+
+Near the end of the game the tree is small enough to search to the very end, and
+then there is no need for an evaluation function: the value of a position is
+the final disc differential (`score`) with best play on both sides.  A
+depth-limited search that sees only `final_value`'s win/loss constants cannot
+tell a narrow win from a wide one; the solver can.
+
+The solver works directly on bitboards (see `othello_bitboard`) and orders
+moves with two classic endgame heuristics:
+
+- *Parity*: the board is split into four quadrants, and moves into a quadrant
+  with an odd number of empty squares come first, since whoever moves into
+  such a region last usually gets the last move there.
+- *Fastest first*: with more empties left, moves that leave the opponent the
+  fewest replies come first; they narrow the tree quickly and tend to be good.
+
+The last one or two empty squares are handled by dedicated code that skips
+move generation altogether.
+"""
+
+from othello_bitboard import (FULL, BIT_TO_SQUARE, flip_bits, legal_bits, popcount,
+                              to_bitboards)
+
+# The solver takes over from the midgame search at this many empties.  Each
+# extra empty square multiplies the work by roughly four.
+ENDGAME_EMPTIES = 12
+
+# Below this many empties, moves are ordered by parity alone; sorting by
+# mobility costs more than it saves.
+FASTEST_FIRST_EMPTIES = 7
+
+# The four 4x4 quadrants of the board.
+QUADRANTS = (0x000000000f0f0f0f, 0x00000000f0f0f0f0,
+             0x0f0f0f0f00000000, 0xf0f0f0f000000000)
+
+
+def bits_of(bits):
+    """List the single-bit squares set in `bits`."""
+    result = []
+    while bits:
+        low = bits & -bits
+        result.append(low)
+        bits ^= low
+    return result
+
+
+class EndgameSolver:
+    """
+    Solve positions exactly, or (with `wld=True`) only to win/loss/draw.
+    `nodes` counts the positions visited since the solver was made.
+    """
+
+    def __init__(self, wld=False):
+        self.wld = wld
+        self.nodes = 0
+
+    def best_move(self, player, board):
+        """
+        Return (value, move) for player on a list board, where value is the
+        final disc differential with perfect play--or just its sign (-1, 0, 1)
+        in win/loss/draw mode.
+        """
+        own, opp = to_bitboards(player, board)
+        alpha, beta = (-1, 1) if self.wld else (-64, 64)
+        best_move, best = None, -65
+        for move in self.ordered_moves(own, opp, legal_bits(own, opp)):
+            flips = flip_bits(move, own, opp)
+            val = -self.solve(opp & ~flips, own | flips | move, -beta, -alpha)
+            if val > best:
+                best, best_move = val, move
+                alpha = max(alpha, val)
+                if alpha >= beta:
+                    break
+        if best_move is None:
+            return None, None
+        if self.wld:
+            best = (best > 0) - (best < 0)
+        return best, BIT_TO_SQUARE[best_move.bit_length() - 1]
+
+    def solve(self, own, opp, alpha, beta):
+        """
+        The final disc differential for the side owning `own`, to move, with
+        perfect play.  Fail-soft: a value outside (alpha, beta) is only a bound.
+        """
+        empty = ~(own | opp) & FULL
+        if empty & (empty - 1) == 0:
+            return self.solve_last(own, opp, empty)
+        self.nodes += 1
+        if popcount(empty) == 2:
+            return self.solve_last_two(own, opp, empty, alpha, beta)
+        moves = legal_bits(own, opp)
+        if not moves:
+            if not legal_bits(opp, own):
+                return self.final(own, opp)
+            return -self.solve(opp, own, -beta, -alpha)
+        best = -65
+        for move in self.ordered_moves(own, opp, moves):
+            flips = flip_bits(move, own, opp)
+            val = -self.solve(opp & ~flips, own | flips | move, -beta, -alpha)
+            if val > best:
+                best = val
+                if val > alpha:
+                    alpha = val
+                    if alpha >= beta:
+                        break
+        return best
+
+    def solve_last_two(self, own, opp, empty, alpha, beta):
+        """Solve a position with exactly two empty squares."""
+        first, second = bits_of(empty)
+        best = -65
+        for move, other in ((first, second), (second, first)):
+            flips = flip_bits(move, own, opp)
+            if flips:
+                val = -self.solve_last(opp & ~flips, own | flips | move, other)
+                if val > best:
+                    best = val
+                    if val >= beta:
+                        return best
+        if best > -65:
+            return best
+        # We must pass, and the opponent picks the reply that is worst for us.
+        worst = 65
+        for move, other in ((first, second), (second, first)):
+            flips = flip_bits(move, opp, own)
+            if flips:
+                val = self.solve_last(own & ~flips, opp | flips | move, other)
+                if val < worst:
+                    worst = val
+                    if val <= alpha:
+                        return worst
+        if worst < 65:
+            return worst
+        return self.final(own, opp)
+
+    def solve_last(self, own, opp, move):
+        """Solve a position whose only empty square is `move`."""
+        self.nodes += 1
+        flips = flip_bits(move, own, opp)
+        if flips:
+            return self.final(own | flips | move, opp & ~flips)
+        flips = flip_bits(move, opp, own)
+        if flips:
+            return self.final(own & ~flips, opp | flips | move)
+        return self.final(own, opp)
+
+    def final(self, own, opp):
+        """The disc differential of a finished game, as `score` counts it."""
+        return popcount(own) - popcount(opp)
+
+    def ordered_moves(self, own, opp, moves):
+        """Single-bit moves, best-first by parity and (early on) by mobility."""
+        empty = ~(own | opp) & FULL
+        odd = 0
+        for quadrant in QUADRANTS:
+            if popcount(empty & quadrant) & 1:
+                odd |= quadrant
+        if popcount(empty) < FASTEST_FIRST_EMPTIES:
+            return sorted(bits_of(moves), key=lambda move: not move & odd)
+
+        def rank(move):
+            flips = flip_bits(move, own, opp)
+            replies = legal_bits(opp & ~flips, own | flips | move)
+            return popcount(replies), not move & odd
+
+        return sorted(bits_of(moves), key=rank)
@@ -0,0 +1,315 @@
+"""
+A feature-based evaluation, for single boards and for whole batches of them.
+
+`weighted_score` only counts discs by square.  `FeatureEvaluator` looks at
+what decides Othello games in practice, each as a difference between the side
+to move and the opponent:
+
+- *mobility*: the number of legal moves;
+- *potential mobility*: empty squares next to an opponent's disc, where moves
+  may open up later;
+- *frontier*: discs next to an empty square, which give the opponent moves
+  (so its weight is negative);
+- *stable*: discs that can never be flipped--here the corners, and the runs of
+  discs along an edge that start from an owned corner;
+- *corners*: corners held;
+- *parity*: +1 if the side to move would get the last move (an odd number of
+  empty squares), -1 otherwise.
+
+Which of these matters most changes as the game goes on, so the weights depend
+on the phase: `PHASE_WEIGHTS` gives one set per range of empty squares.  Values
+are integers (the null-window searches need that) and stay strictly between
+`MIN_VALUE` and `MAX_VALUE`, which are reserved for finished games.
+
+`evaluate_batch` computes the same values with NumPy for an (N, 64) int8 array
+of boards--+1 for the side to move, -1 for the opponent, 0 for empty, squares
+in `othello_tables.SQUARES` order--and `evaluate_boards` does the same for a
+list of boards, which is how `alphabeta` and `pvs` score all the children of a
+node one ply above the leaves in one call.  NumPy is optional: the batch path
+needs NumPy 2.0 or later (for `np.bitwise_count`), and without it--or with an
+older NumPy--`evaluate_boards` scores the boards one at a time.
+
+`SquareEvaluator` is `weighted_score` with square weights fitted by
+`othello_train` in place of `SQUARE_WEIGHTS`.
+"""
+
+import json
+
+import othello_base as base
+import othello_bitboard as bitboard
+import othello_tables as tables
+from othello_v0001 import MAX_VALUE, MIN_VALUE
+
+# NumPy is optional, and a NumPy older than 2.0 (without `bitwise_count`) is
+# treated as missing.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+if np is not None and not hasattr(np, 'bitwise_count'):
+    np = None
+
+FEATURES = ('mobility', 'potential_mobility', 'frontier', 'stable', 'corners', 'parity')
+
+# (fewest empty squares, weights in FEATURES order) for each phase, from the
+# opening to the endgame.
+PHASE_WEIGHTS = (
+    (41, (8, 4, -4, 15, 60, 0)),
+    (19, (6, 3, -3, 20, 60, 2)),
+    (0, (3, 1, -1, 30, 60, 10)),
+)
+
+
+def phase_weights(empty):
+    """The weights for a board with `empty` empty squares."""
+    for fewest, weights in PHASE_WEIGHTS:
+        if empty >= fewest:
+            return weights
+
+
+# -----------------------------------------------------------------------------
+## One board at a time
+
+def has_bracket(square, player, opp, board):
+    """Would player flip anything by moving to the (empty) square?"""
+    for ray in tables.RAYS[square]:
+        if board[ray[0]] == opp:
+            for sq in ray:
+                piece = board[sq]
+                if piece != opp:
+                    if piece == player:
+                        return True
+                    break
+    return False
+
+
+def stable_discs(player, board):
+    """The corners player holds, and player's edge runs that start from them."""
+    stable = set()
+    for corner, edge_rays in tables.EDGE_RAYS.items():
+        if board[corner] == player:
+            stable.add(corner)
+            for ray in edge_rays:
+                for sq in ray:
+                    if board[sq] != player:
+                        break
+                    stable.add(sq)
+    return len(stable)
+
+
+def features(player, board):
+    """The feature differences for player, in FEATURES order, and the empty count."""
+    opp = base.WHITE if player == base.BLACK else base.BLACK
+    mobility = potential = frontier = corners = 0
+    empty = 0
+    for sq in tables.SQUARES:
+        piece = board[sq]
+        if piece == base.EMPTY:
+            empty += 1
+            if has_bracket(sq, player, opp, board):
+                mobility += 1
+            if has_bracket(sq, opp, player, board):
+                mobility -= 1
+            neighbors = [board[n] for n in tables.NEIGHBORS[sq]]
+            if opp in neighbors:
+                potential += 1
+            if player in neighbors:
+                potential -= 1
+        elif any(board[n] == base.EMPTY for n in tables.NEIGHBORS[sq]):
+            frontier += 1 if piece == player else -1
+    for corner in tables.CORNERS:
+        if board[corner] == player:
+            corners += 1
+        elif board[corner] == opp:
+            corners -= 1
+    stable = stable_discs(player, board) - stable_discs(opp, board)
+    parity = 1 if empty % 2 else -1
+    return (mobility, potential, frontier, stable, corners, parity), empty
+
+
+class FeatureEvaluator:
+    """
+    An evaluation function, called as evaluate(player, board) like `score`
+    and `weighted_score`, with `evaluate_batch` for many boards at once.
+    """
+
+    def __init__(self, phase_weights=PHASE_WEIGHTS):
+        self.phase_weights = phase_weights
+        if np is not None:
+            self.weight_array = np.array([w for _, w in phase_weights], dtype=np.int32)
+            self.phase_limits = np.array([fewest for fewest, _ in phase_weights])
+
+    def __call__(self, player, board):
+        values, empty = features(player, board)
+        for fewest, weights in self.phase_weights:
+            if empty >= fewest:
+                break
+        total = sum(w * v for w, v in zip(weights, values))
+        return max(MIN_VALUE + 1, min(MAX_VALUE - 1, total))
+
+    def evaluate_batch(self, boards):
+        """Values of an (N, 64) int8 array of boards, to the side to move."""
+        values, empty = batch_features(boards)
+        # The first phase whose lower limit the board reaches.
+        phase = np.argmax(empty[:, None] >= self.phase_limits[None, :], axis=1)
+        total = (values * self.weight_array[phase]).sum(axis=1)
+        return np.clip(total, MIN_VALUE + 1, MAX_VALUE - 1)
+
+    def evaluate_boards(self, player, boards):
+        """Values of a list of boards to player, in one batch if NumPy is there."""
+        if np is None:
+            return [self(player, board) for board in boards]
+        return self.evaluate_batch(to_array(player, boards)).tolist()
+
+
+# -----------------------------------------------------------------------------
+## Fitted square weights
+
+def load_square_weights(path):
+    """Read the 100 square weights from a file written by `othello_train`."""
+    with open(path) as f:
+        weights = json.load(f)['square_weights']
+    if len(weights) != 100:
+        raise ValueError('%s holds %d square weights, expected 100' % (path, len(weights)))
+    return weights
+
+
+class SquareEvaluator:
+    """`weighted_score` with the square weights of a file (or list) instead."""
+
+    def __init__(self, weights):
+        self.weights = load_square_weights(weights) if isinstance(weights, str) else weights
+
+    def __call__(self, player, board):
+        weights = self.weights
+        total = 0
+        for sq in tables.SQUARES:
+            piece = board[sq]
+            if piece == player:
+                total += weights[sq]
+            elif piece != base.EMPTY:
+                total -= weights[sq]
+        return max(MIN_VALUE + 1, min(MAX_VALUE - 1, total))
+
+
+# -----------------------------------------------------------------------------
+## Batches of boards
+
+# The batch path packs each board into a pair of NumPy uint64 bitboards laid
+# out as in `othello_bitboard` (bit 0 is square 11), so that every step of a
+# feature is one array operation over the whole batch.  Both sides go through
+# mobility and stability together, stacked into one array of 2N boards.
+
+# Square codes in an array board.
+ARRAY_CODES = {base.EMPTY: 0, base.BLACK: 1, base.WHITE: -1, base.OUTER: 0}
+if np is not None:
+    SQUARE_INDEX = np.array(tables.SQUARES)
+    # Maps a piece's byte to its code from Black's side.
+    _BYTE_CODES = np.zeros(256, dtype=np.int8)
+    for _piece, _code in ARRAY_CODES.items():
+        _BYTE_CODES[ord(_piece)] = _code
+    # (amount, towards bit 63?, mask) for each of `othello_bitboard.DIRECTION_SHIFTS`.
+    _SHIFTS = tuple((np.uint64(abs(amount)), amount > 0, np.uint64(mask))
+                    for amount, mask in bitboard.DIRECTION_SHIFTS)
+    _CORNER_BITS = np.uint64(sum(1 << bitboard.SQUARE_TO_BIT[c] for c in tables.CORNERS))
+    _TOP_ROW = np.uint64(0xff)
+    _SEVEN = np.uint64(7)
+    _FIFTY_SIX = np.uint64(56)
+    # Gathering the column-1 bits with a multiply leaves them in the top byte.
+    _FILE_A = np.uint64(0x0101010101010101)
+    _FILE_MAGIC = np.uint64(0x0102040810204080)
+
+
+def edge_stable_count(line):
+    """Count the discs of an 8-bit edge line that are in a run from either end."""
+    if line == 0xff:
+        return 8
+    count = 0
+    for bits in (range(8), range(7, -1, -1)):
+        for bit in bits:
+            if not line >> bit & 1:
+                break
+            count += 1
+    return count
+
+
+if np is not None:
+    _EDGE_STABLE = np.array([edge_stable_count(line) for line in range(256)], dtype=np.int32)
+
+
+def to_array(player, boards):
+    """Pack list boards into an (N, 64) int8 array from player's side."""
+    data = ''.join(''.join(board[:100]) for board in boards).encode('ascii')
+    codes = _BYTE_CODES[np.frombuffer(data, dtype=np.uint8)].reshape(len(boards), 100)
+    codes = codes[:, SQUARE_INDEX]
+    return codes if player == base.BLACK else -codes
+
+
+def to_bitboards(boards):
+    """The (own, opp) uint64 bitboards of each row of an (N, 64) array."""
+    # Each row is 64 bits, so the rows pack end to end into whole uint64s.
+    def pack(mask):
+        return np.packbits(mask.ravel(), bitorder='little').view('<u8')
+    return pack(boards == 1), pack(boards == -1)
+
+
+def popcount(bits):
+    """Count the set bits of each element, as signed integers."""
+    return np.bitwise_count(bits).astype(np.int32)
+
+
+def shift(bits, step):
+    """Move every bit one square in the direction of a `_SHIFTS` step."""
+    amount, up, mask = step
+    return ((bits << amount) if up else (bits >> amount)) & mask
+
+
+def batch_mobility(own, opp):
+    """Count the legal moves for `own` on each pair of bitboards."""
+    empty = ~(own | opp)
+    moves = np.zeros_like(own)
+    for step in _SHIFTS:
+        run = shift(own, step) & opp
+        for _ in range(5):
+            run |= shift(run, step) & opp
+        moves |= shift(run, step) & empty
+    return popcount(moves)
+
+
+def batch_near(bits):
+    """The squares next to any set bit."""
+    near = np.zeros_like(bits)
+    for step in _SHIFTS:
+        near |= shift(bits, step)
+    return near
+
+
+def batch_stable(own):
+    """Count each bitboard's corners and corner-anchored edge runs, as `stable_discs`."""
+    edges = (own & _TOP_ROW, own >> _FIFTY_SIX,
+             ((own & _FILE_A) * _FILE_MAGIC) >> _FIFTY_SIX,
+             (((own >> _SEVEN) & _FILE_A) * _FILE_MAGIC) >> _FIFTY_SIX)
+    # Each owned corner is the end of two edges' runs.
+    return sum(_EDGE_STABLE[edge.astype(np.intp)] for edge in edges) - popcount(own & _CORNER_BITS)
+
+
+def batch_features(boards):
+    """`features` for each row of an (N, 64) array: an (N, 6) array and the empties."""
+    n = len(boards)
+    own, opp = to_bitboards(boards)
+    empty = ~(own | opp)
+    sides = np.concatenate([own, opp])
+    mobility = batch_mobility(sides, np.concatenate([opp, own]))
+    stable = batch_stable(sides)
+    near = batch_near(np.concatenate([empty, own, opp]))
+    near_empty, near_own, near_opp = near[:n], near[n:2 * n], near[2 * n:]
+    empties = popcount(empty)
+    values = np.stack([
+        mobility[:n] - mobility[n:],
+        popcount(empty & near_opp) - popcount(empty & near_own),
+        popcount(own & near_empty) - popcount(opp & near_empty),
+        stable[:n] - stable[n:],
+        popcount(own & _CORNER_BITS) - popcount(opp & _CORNER_BITS),
+        np.where(empties % 2 == 1, 1, -1),
+    ], axis=1)
+    return values, empties
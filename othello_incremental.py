@@ -0,0 +1,134 @@
+"""
+Incremental evaluation: boards that carry their own weighted score.
+
+`weighted_score` and `score` look at all 64 squares, and in a deep search
+almost every node is a leaf where one of them is called.  But a move changes
+only the square played and the discs it flips, so the totals can be kept up
+to date as moves are made instead, and a leaf evaluation becomes two list
+lookups.
+
+An engine with `IncrementalMixin` plays on boards with two extra slots after
+the 100 squares: `WEIGHT_SUM`, the `SQUARE_WEIGHTS` total of Black's squares
+minus White's, and `DISC_DIFF`, Black's discs minus White's.  Both are from
+Black's side, so the side to move only decides the sign.  `make_move`,
+`do_move` and `undo_move` keep them current, copying a board with
+`list(board)` copies the totals with it, and code that only looks at the
+squares never notices they are there.  Plain 100-square boards still work;
+they are just evaluated the slow way.
+
+    class Engine(IncrementalMixin, othello_v0001.v0001):
+        pass
+"""
+
+import othello_base as base
+import othello_base_GUI as gui
+import othello_v0001 as ob
+
+# Where the running totals live on a board.
+WEIGHT_SUM = 100
+DISC_DIFF = 101
+
+
+class IncrementalMixin:
+    """Keep the weighted and disc totals of each board up to date."""
+
+    def initial_board(self):
+        return self.with_totals(super().initial_board())
+
+    def with_totals(self, board):
+        """A copy of a board's squares with the totals computed from scratch."""
+        board = list(board[:WEIGHT_SUM])
+        weights = discs = 0
+        for sq in self.squares():
+            if board[sq] == base.BLACK:
+                weights += ob.SQUARE_WEIGHTS[sq]
+                discs += 1
+            elif board[sq] == base.WHITE:
+                weights -= ob.SQUARE_WEIGHTS[sq]
+                discs -= 1
+        return board + [weights, discs]
+
+    def make_move(self, move, player, board, *args, **kwargs):
+        """Update the board (and its totals) to reflect the move by player."""
+        if len(board) <= WEIGHT_SUM:
+            return super().make_move(move, player, board, *args, **kwargs)
+        flips = self.find_flips(move, player, board)
+        if args or kwargs:
+            # Drawing (non-silent) moves go through the class we are mixed into.
+            super().make_move(move, player, board, *args, **kwargs)
+        else:
+            board[move] = player
+            for sq in flips:
+                board[sq] = player
+        self.add_move(move, player, board, flips)
+        return board
+
+    def do_move(self, move, player, board):
+        """Make the move in place and return the squares it flipped."""
+        flips = self.find_flips(move, player, board)
+        board[move] = player
+        for sq in flips:
+            board[sq] = player
+        if len(board) > WEIGHT_SUM:
+            self.add_move(move, player, board, flips)
+        return flips
+
+    def undo_move(self, move, player, board, flips):
+        """Take back a move made by `do_move`, given the squares it flipped."""
+        board[move] = base.EMPTY
+        opp = base.WHITE if player == base.BLACK else base.BLACK
+        for sq in flips:
+            board[sq] = opp
+        if len(board) > WEIGHT_SUM:
+            self.add_move(move, player, board, flips, -1)
+
+    def add_move(self, move, player, board, flips, sign=1):
+        """
+        Add to the totals a piece placed on `move` and the `flips` it made, or
+        with sign=-1, take them away again.
+        """
+        weights = ob.SQUARE_WEIGHTS
+        # A flipped disc moves its weight from one side to the other.
+        gain = weights[move]
+        for sq in flips:
+            gain += 2 * weights[sq]
+        if player == base.WHITE:
+            sign = -sign
+        board[WEIGHT_SUM] += sign * gain
+        board[DISC_DIFF] += sign * (1 + 2 * len(flips))
+
+    def weighted_score(self, player, board):
+        """
+        Compute the difference between the sum of the weights of player's
+        squares and the sum of the weights of the opponent's squares.
+        """
+        if len(board) <= WEIGHT_SUM:
+            return super().weighted_score(player, board)
+        return board[WEIGHT_SUM] if player == base.BLACK else -board[WEIGHT_SUM]
+
+    def score(self, player, board):
+        """Compute player's score (number of player's pieces minus opponent's)."""
+        if len(board) <= DISC_DIFF:
+            return super().score(player, board)
+        return board[DISC_DIFF] if player == base.BLACK else -board[DISC_DIFF]
+
+
+class IncrementalEngine(IncrementalMixin, ob.v0001):
+    """The v0001 strategies with incremental evaluation."""
+
+
+class HeadlessIncrementalEngine(IncrementalMixin, ob.Strategies):
+    """The same, without the window, images and sounds."""
+
+
+def headless_class(engine):
+    """
+    The class for a search engine to use apart from engine (in a worker
+    process, say): engine's own class unless it is a GUI engine, in which case
+    the same strategies without the window.
+    """
+    if not isinstance(engine, gui.OthelloGUI):
+        return type(engine)
+    if isinstance(engine, IncrementalMixin):
+        return HeadlessIncrementalEngine
+    return ob.Strategies
@@ -0,0 +1,104 @@
+"""
+Move ordering for alpha-beta search.
+
+Alpha-beta prunes the most when the best move at each node is searched first:
+one good move is often enough to prove that the rest are not worth looking at.
+`MoveOrderer` sorts the legal moves at a node by, in turn:
+
+1. the hash move, the best move stored for this position in the transposition
+   table by an earlier (usually shallower) search;
+2. killer moves, recent moves that caused a cutoff at the same ply in a sibling
+   position, and so are likely to refute this one too;
+3. the history table, which scores every square by how often (and how deeply)
+   playing it has caused a cutoff so far; and
+4. a static order from the square weights, so corners come first and the
+   squares next to them last.
+"""
+
+import othello_base as ob
+
+# How many killer moves are remembered for each ply.
+KILLERS_PER_PLY = 2
+
+
+class MoveOrderer:
+    """Order moves at each node and learn from the cutoffs a search reports."""
+
+    def __init__(self, square_weights, killers=KILLERS_PER_PLY):
+        self.square_weights = square_weights
+        self.max_killers = killers
+        self.clear()
+
+    def clear(self):
+        """Forget all killers and history."""
+        self.killers = []
+        self.history = {ob.BLACK: [0] * 100, ob.WHITE: [0] * 100}
+        self.nodes = self.cutoffs = self.first_move_cutoffs = 0
+
+    def new_search(self):
+        """
+        Start a new move decision: killers belong to the old tree and are
+        dropped, and history is halved so recent cutoffs count the most.
+        """
+        self.killers = []
+        for table in self.history.values():
+            for sq in range(100):
+                table[sq] >>= 1
+
+    def order(self, moves, player, ply, hash_move=None):
+        """Return moves sorted best-first for player at the given ply."""
+        self.nodes += 1
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        history = self.history[player]
+        weights = self.square_weights
+
+        def rank(move):
+            if move == hash_move:
+                return (2, 0, 0)
+            if move in killers:
+                return (1, -killers.index(move), 0)
+            return (0, history[move], weights[move])
+
+        return sorted(moves, key=rank, reverse=True)
+
+    def cutoff(self, move, player, ply, depth, index):
+        """
+        Record that `move`, the `index`th move tried at this node, caused a
+        beta cutoff with `depth` plies left to search.
+        """
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        killers = self.killers[ply]
+        if move in killers:
+            killers.remove(move)
+        killers.insert(0, move)
+        del killers[self.max_killers:]
+        self.history[player][move] += depth * depth
+
+    def first_move_cutoff_rate(self):
+        """Fraction of cutoffs produced by the first move tried--1.0 is perfect."""
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+
+def measure_savings(engine, positions, depth, evaluate, orderer):
+    """
+    Search each (player, board) in `positions` with `engine.alphabeta_searcher`
+    with and without `orderer`, counting leaf evaluations.  Returns the pair
+    (leaves_unordered, leaves_ordered).
+    """
+    counts = []
+    for use_orderer in (None, orderer):
+        leaves = [0]
+
+        def counting_evaluate(player, board):
+            leaves[0] += 1
+            return evaluate(player, board)
+
+        strategy = engine.alphabeta_searcher(depth, counting_evaluate, orderer=use_orderer)
+        for player, board in positions:
+            strategy(player, list(board))
+        counts.append(leaves[0])
+    return tuple(counts)
@@ -82,10 +82,16 @@ UP, DOWN, LEFT, RIGHT = -10, 10, -1, 1
 UP_RIGHT, DOWN_RIGHT, DOWN_LEFT, UP_LEFT = -9, 11, 9, -11
 DIRECTIONS = (UP, UP_RIGHT, RIGHT, DOWN_RIGHT, DOWN, DOWN_LEFT, LEFT, UP_LEFT)
 
+# The squares, and the rays from each square in each direction, are computed
+# once in `othello_tables` rather than on every call.  The transposition
+# table used by the searchers below is in `othello_tt`.
+import othello_tables as tables
+import othello_tt as tt
+
 
 def squares():
     """List all the valid squares on the board."""
-    return [i for i in range(11, 89) if 1 <= (i % 10) <= 8]
+    return tables.SQUARES
 
 
 def initial_board():
@@ -124,7 +130,7 @@ def print_board(board):
 
 def is_valid(move):
     """Is move a square on the board?"""
-    return isinstance(move, int) and move in squares()
+    return isinstance(move, int) and move in tables.SQUARE_SET
 
 
 def opponent(player):
@@ -137,19 +143,31 @@ def find_bracket(square, player, board, direction):
     Find a square that forms a bracket with `square` for `player` in the given
     `direction`.  Returns None if no such square exists.
     """
-    bracket = square + direction
-    if board[bracket] == player:
-        return None
+    ray = tables.DIRECTION_RAYS[square][direction]
     opp = opponent(player)
-    while board[bracket] == opp:
-        bracket += direction
-    return None if board[bracket] in (OUTER, EMPTY) else bracket
+    if len(ray) < 2 or board[ray[0]] != opp:
+        return None
+    for sq in ray:
+        piece = board[sq]
+        if piece != opp:
+            return sq if piece == player else None
+    return None
 
 
 def is_legal(move, player, board):
     """Is this a legal move for the player?"""
-    hasbracket = lambda direction: find_bracket(move, player, board, direction)
-    return board[move] == EMPTY and any(map(hasbracket, DIRECTIONS))
+    if board[move] != EMPTY:
+        return False
+    opp = opponent(player)
+    for ray in tables.RAYS[move]:
+        if board[ray[0]] == opp:
+            for sq in ray:
+                piece = board[sq]
+                if piece != opp:
+                    if piece == player:
+                        return True
+                    break
+    return False
 
 
 ### Making moves
@@ -176,6 +194,41 @@ def make_flips(move, player, board, direction):
         square += direction
 
 
+def find_flips(move, player, board):
+    """List the squares that would flip if player made the move."""
+    flips = []
+    opp = opponent(player)
+    for ray in tables.RAYS[move]:
+        if board[ray[0]] == opp:
+            for i, sq in enumerate(ray):
+                piece = board[sq]
+                if piece != opp:
+                    if piece == player:
+                        flips.extend(ray[:i])
+                    break
+    return flips
+
+
+# A search walks its whole tree on one board: each move is made in place and
+# then taken back, instead of being made on a fresh copy of the board.
+
+def do_move(move, player, board):
+    """Make the move in place and return the squares it flipped."""
+    flips = find_flips(move, player, board)
+    board[move] = player
+    for sq in flips:
+        board[sq] = player
+    return flips
+
+
+def undo_move(move, player, board, flips):
+    """Take back a move made by `do_move`, given the squares it flipped."""
+    board[move] = EMPTY
+    opp = opponent(player)
+    for sq in flips:
+        board[sq] = opp
+
+
 ### Monitoring players
 
 class IllegalMoveError(Exception):
@@ -284,7 +337,11 @@ def maximizer(evaluate):
 
     def strategy(player, board):
         def score_move(move):
-            return evaluate(player, make_move(move, player, list(board)))
+            flips = do_move(move, player, board)
+            try:
+                return evaluate(player, board)
+            finally:
+                undo_move(move, player, board, flips)
 
         return max(legal_moves(player, board), key=score_move)
 
@@ -301,18 +358,9 @@ def maximizer(evaluate):
 # could weight those more heavily, and add negative weights to the squares that,
 # if acquired, could lead to the opponent capturing the corners or edges.
 
-SQUARE_WEIGHTS = [
-    0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
-    0, 120, -20, 20, 5, 5, 20, -20, 120, 0,
-    0, -20, -40, -5, -5, -5, -5, -40, -20, 0,
-    0, 20, -5, 15, 3, 3, 15, -5, 20, 0,
-    0, 5, -5, 3, 3, 3, 3, -5, 5, 0,
-    0, 5, -5, 3, 3, 3, 3, -5, 5, 0,
-    0, 20, -5, 15, 3, 3, 15, -5, 20, 0,
-    0, -20, -40, -5, -5, -5, -5, -40, -20, 0,
-    0, 120, -20, 20, 5, 5, 20, -20, 120, 0,
-    0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
-]
+# The weights are shared with `othello_v0001` and kept in `othello_tables`;
+# `othello_train` can fit new ones from self-play games.
+SQUARE_WEIGHTS = tables.SQUARE_WEIGHTS
 
 
 # A strategy constructed as `maximizer(weighted_score)`, then, will always
@@ -341,23 +389,34 @@ def weighted_score(player, board):
 # the implications of a move several turns in advance could have a significant
 # advantage.  The **minimax** algorithm does just that.
 
-def minimax(player, board, depth, evaluate):
+def minimax(player, board, depth, evaluate, table=None, key=None):
     """
     Find the best legal move for player, searching to the specified depth.
     Returns a tuple (move, min_score), where min_score is the guaranteed minimum
-    score achievable for player if the move is made.
+    score achievable for player if the move is made.  If a transposition
+    `table` is given, exact values already computed at least this deep are
+    reused; `key` is the board's Zobrist key (computed when omitted).
     """
 
     # We define the value of a board to be the opposite of its value to our
     # opponent, computed by recursively applying `minimax` for our opponent.
-    def value(board):
-        return -minimax(opponent(player), board, depth - 1, evaluate)[0]
+    def value(board, key=None):
+        return -minimax(opponent(player), board, depth - 1, evaluate, table, key)[0]
 
     # When depth is zero, don't examine possible moves--just determine the value
     # of this board to the player.
     if depth == 0:
         return evaluate(player, board), None
 
+    if table is not None:
+        if key is None:
+            key = tt.zobrist_key(player, board)
+        # Only exact values will do: an alpha-beta search sharing the table
+        # stores bounds as well.
+        entry = table.get(key)
+        if entry is not None and entry[1] >= depth and entry[2] == tt.EXACT:
+            return entry[3], entry[4]
+
     # We want to evaluate all the legal moves by considering their implications
     # `depth` turns in advance.  First, find all the legal moves.
     moves = legal_moves(player, board)
@@ -368,11 +427,35 @@ def minimax(player, board, depth, evaluate):
         if not any_legal_move(opponent(player), board):
             return final_value(player, board), None
         # or we have to pass this turn, so just find the value of this board.
-        return value(board), None
+        return value(board, pass_key(key)), None
 
     # When there are multiple legal moves available, choose the best one by
     # maximizing the value of the resulting boards.
-    return max((value(make_move(m, player, list(board))), m) for m in moves)
+    results = []
+    for m in moves:
+        flips = do_move(m, player, board)
+        try:
+            results.append((value(board, move_key(key, m, player, flips)), m))
+        finally:
+            undo_move(m, player, board, flips)
+    best = max(results)
+    if table is not None:
+        table.store(key, depth, tt.EXACT, best[0], best[1])
+    return best
+
+
+# With a transposition table each board travels with its Zobrist key, which is
+# updated from the flipped squares instead of being recomputed.
+
+
+def move_key(key, move, player, flips):
+    """The key after a move, or None when no key is being tracked."""
+    return None if key is None else tt.update_key(key, move, player, flips)
+
+
+def pass_key(key):
+    """The key after a pass, or None when no key is being tracked."""
+    return None if key is None else tt.pass_key(key)
 
 
 # Values for endgame boards are big constants.
@@ -390,14 +473,16 @@ def final_value(player, board):
     return diff
 
 
-def minimax_searcher(depth, evaluate):
+def minimax_searcher(depth, evaluate, table=None):
     """
     Construct a strategy that uses `minimax` with the specified leaf board
-    evaluation function.
+    evaluation function, and optionally a transposition table.
     """
 
     def strategy(player, board):
-        return minimax(player, board, depth, evaluate)[1]
+        if table is not None:
+            table.new_search()
+        return minimax(player, board, depth, evaluate, table)[1]
 
     return strategy
 
@@ -426,15 +511,27 @@ def minimax_searcher(depth, evaluate):
 # we can quit searching this subtree since the opponent can prevent us from
 # playing it.
 
-def alphabeta(player, board, alpha, beta, depth, evaluate):
+def alphabeta(player, board, alpha, beta, depth, evaluate, table=None, key=None):
     """
     Find the best legal move for player, searching to the specified depth.  Like
-    minimax, but uses the bounds alpha and beta to prune branches.
+    minimax, but uses the bounds alpha and beta to prune branches.  With a
+    transposition `table`, each position is looked up before it is expanded.
     """
     if depth == 0:
         return evaluate(player, board), None
 
-    def value(board, alpha, beta):
+    # A stored result may settle this position outright or narrow the window;
+    # either way its best move is the one to try first.
+    hash_move = None
+    if table is not None:
+        if key is None:
+            key = tt.zobrist_key(player, board)
+        val, hash_move, alpha, beta = table.lookup(key, depth, alpha, beta)
+        if val is not None:
+            return val, hash_move
+    alpha0 = alpha
+
+    def value(board, alpha, beta, key=None):
         # Like in `minimax`, the value of a board is the opposite of its value
         # to the opponent.  We pass in `-beta` and `-alpha` as the alpha and
         # beta values, respectively, for the opponent, since `alpha` represents
@@ -442,32 +539,44 @@ def alphabeta(player, board, alpha, beta, depth, evaluate):
         # achievable by the opponent.  Similarly, `beta` is the worst score that
         # our opponent can hold us to, so it is the best score that they can
         # achieve.
-        return -alphabeta(opponent(player), board, -beta, -alpha, depth - 1, evaluate)[0]
+        return -alphabeta(opponent(player), board, -beta, -alpha, depth - 1,
+                          evaluate, table, key)[0]
 
     moves = legal_moves(player, board)
     if not moves:
         if not any_legal_move(opponent(player), board):
             return final_value(player, board), None
-        return value(board, alpha, beta), None
+        return value(board, alpha, beta, pass_key(key)), None
 
+    if hash_move in moves:
+        moves.remove(hash_move)
+        moves.insert(0, hash_move)
     best_move = moves[0]
     for move in moves:
         if alpha >= beta:
             # If one of the legal moves leads to a better score than beta, then
             # the opponent will avoid this branch, so we can quit looking.
             break
-        val = value(make_move(move, player, list(board)), alpha, beta)
+        flips = do_move(move, player, board)
+        try:
+            val = value(board, alpha, beta, move_key(key, move, player, flips))
+        finally:
+            undo_move(move, player, board, flips)
         if val > alpha:
             # If one of the moves leads to a better score than the current best
             # achievable score, then replace it with this one.
             alpha = val
             best_move = move
+    if table is not None:
+        table.store(key, depth, tt.bound_flag(alpha, alpha0, beta), alpha, best_move)
     return alpha, best_move
 
 
-def alphabeta_searcher(depth, evaluate):
+def alphabeta_searcher(depth, evaluate, table=None):
     def strategy(player, board):
-        return alphabeta(player, board, MIN_VALUE, MAX_VALUE, depth, evaluate)[1]
+        if table is not None:
+            table.new_search()
+        return alphabeta(player, board, MIN_VALUE, MAX_VALUE, depth, evaluate, table)[1]
 
     return strategy
 
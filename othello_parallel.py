@@ -0,0 +1,260 @@
+"""
+Root-parallel alpha-beta search across processes.
+
+Each legal move at the root is an independent subtree, so the subtrees can be
+searched by a pool of worker processes at the same time.  Two things keep this
+from simply multiplying the work by the number of moves:
+
+- *Young brothers wait*: the first (best-ordered) move is searched on its own
+  first, to establish a good alpha before the other moves are handed out.
+- *A shared bound*: alpha lives in a `multiprocessing.Value` that every worker
+  reads when it starts a move and raises when it finds a better one, so moves
+  searched later prune against the best value found so far by any worker.
+
+With a time limit the search deepens iteratively, and the best move of the
+last depth that every worker finished is played.
+
+`LazySMPSearcher`, below, parallelizes differently: every worker searches the
+whole position, and they cooperate through a shared transposition table.
+"""
+
+import multiprocessing
+import multiprocessing.util
+import queue
+import random
+import time
+
+import othello_base as base
+import othello_incremental as incremental
+import othello_ordering as ordering
+import othello_tt as tt
+import othello_v0001 as ob
+
+# State of a worker process, set up once by `init_worker`.
+_engine = None
+_alpha = None
+_table = None
+_orderer = None
+
+
+def init_worker(engine_class, shared_alpha):
+    """Set up a worker process with its own engine, table and move orderer."""
+    global _engine, _alpha, _table, _orderer
+    _engine = engine_class()
+    _alpha = shared_alpha
+    _table = tt.TranspositionTable()
+    _orderer = ordering.MoveOrderer(ob.SQUARE_WEIGHTS)
+
+
+def search_move(task):
+    """
+    Search one root move in a worker: task is (move, player, board, depth,
+    evaluate, deadline).  Returns (move, (value, exact)), where `exact` is
+    False when the move only proved to be no better than the shared alpha, or
+    (move, None) if the deadline passed first.
+    """
+    move, player, board, depth, evaluate, deadline = task
+    if isinstance(evaluate, str):
+        evaluate = getattr(_engine, evaluate)
+    if deadline is not None:
+        evaluate = timed(evaluate, deadline)
+    _table.new_search()
+    child = _engine.make_move(move, player, list(board))
+    alpha = _alpha.value
+    try:
+        val = -_engine.alphabeta(_engine.opponent(player), child, -ob.MAX_VALUE, -alpha,
+                                 depth - 1, evaluate, _table, orderer=_orderer, ply=1)[0]
+    except ob.SearchTimeout:
+        return move, None
+    with _alpha.get_lock():
+        if val > _alpha.value:
+            _alpha.value = val
+    return move, (val, val > alpha)
+
+
+def timed(evaluate, deadline):
+    """Wrap evaluate so that it raises SearchTimeout after the deadline."""
+    def timed_evaluate(player, board):
+        if time.time() >= deadline:
+            raise ob.SearchTimeout()
+        return evaluate(player, board)
+    return timed_evaluate
+
+
+class RootParallelSearcher:
+    """
+    A strategy that splits the root moves of an alpha-beta search across
+    `workers` processes (all cores by default).  Without `seconds` it searches
+    to `depth`; with it, it deepens up to `depth` until the time runs out.
+    Call `close` to shut the pool down.
+    """
+
+    def __init__(self, engine, depth, evaluate, workers=None, seconds=None):
+        self.engine = engine
+        self.depth = depth
+        self.seconds = seconds
+        self.workers = workers or multiprocessing.cpu_count()
+        # Bound methods of the engine are sent by name, since the engine itself
+        # (with its pygame surfaces) cannot be pickled.
+        if getattr(evaluate, '__self__', None) is engine:
+            evaluate = evaluate.__name__
+        self.evaluate = evaluate
+        self.alpha = multiprocessing.Value('d', ob.MIN_VALUE)
+        self.pool = None
+
+    def __call__(self, player, board):
+        if self.pool is None:
+            engine_class = incremental.headless_class(self.engine)
+            self.pool = multiprocessing.Pool(self.workers, init_worker,
+                                             (engine_class, self.alpha))
+        deadline = None if self.seconds is None else time.time() + self.seconds
+        moves = self.engine.legal_moves(player, board)
+        moves.sort(key=lambda move: ob.SQUARE_WEIGHTS[move], reverse=True)
+        best_move = moves[0]
+        for depth in range(1 if deadline else self.depth, self.depth + 1):
+            values = self.search(player, board, moves, depth, deadline)
+            if values is None:
+                break
+            # The next depth starts with this depth's best moves.  A move that
+            # fails low reports the alpha it was searched with, so among equal
+            # values the one that was searched exactly comes first.
+            moves.sort(key=lambda move: values[move], reverse=True)
+            best_move = moves[0]
+        return best_move
+
+    def search(self, player, board, moves, depth, deadline):
+        """Search every root move to depth; None if the deadline interrupts."""
+        self.alpha.value = ob.MIN_VALUE
+        tasks = [(move, player, board, depth, self.evaluate, deadline) for move in moves]
+        values = dict([self.pool.apply(search_move, (tasks[0],))])
+        values.update(self.pool.imap_unordered(search_move, tasks[1:]))
+        if None in values.values():
+            return None
+        return values
+
+    def close(self):
+        """Stop the worker processes."""
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+
+
+# -----------------------------------------------------------------------------
+## Lazy SMP
+
+# Splitting the root moves helps little when there are only a few of them.
+# Lazy SMP instead starts several processes that all deepen a search of the
+# whole position at once, sharing a single transposition table in shared
+# memory.  What one worker stores--values, bounds, best moves--lets the others
+# skip or better order the same subtrees, so together they reach a greater
+# depth than one process would.  To keep them from marching in step, odd
+# workers start one ply deeper, and every helper's move orderer starts with a
+# little random history so it tries sibling moves in a different order.  The
+# main process plays the move of the deepest search any worker completed.
+
+def smp_worker(index, engine_class, evaluate, player, board, depth, table_name, table_size,
+               generation, stop, results):
+    """Deepen a search of one position, reporting each completed depth to results."""
+    engine = engine_class()
+    if isinstance(evaluate, str):
+        evaluate = getattr(engine, evaluate)
+    table = tt.SharedTranspositionTable.attach(table_name, table_size)
+    table.generation = generation
+    orderer = ordering.MoveOrderer(ob.SQUARE_WEIGHTS)
+    if index:
+        rng = random.Random(index)
+        for history in orderer.history.values():
+            for sq in range(100):
+                history[sq] = rng.randrange(4)
+
+    def stoppable_evaluate(player, board):
+        if stop.value:
+            raise ob.SearchTimeout()
+        return evaluate(player, board)
+
+    try:
+        for d in range(1 + index % 2, depth + 1):
+            val, move = engine.alphabeta(player, board, ob.MIN_VALUE, ob.MAX_VALUE, d,
+                                         stoppable_evaluate, table, orderer=orderer)
+            results.put((d, val, move))
+    except ob.SearchTimeout:
+        pass
+    finally:
+        table.close()
+
+
+class LazySMPSearcher:
+    """
+    A strategy that runs `workers` processes (all cores by default) deepening
+    the same search for `seconds`, sharing a transposition table of
+    `megabytes`.  The evaluation must return integers.  Call `close` to free
+    the shared table; otherwise it is freed when the searcher is garbage
+    collected or the process exits.
+    """
+
+    def __init__(self, engine, evaluate, seconds, workers=None, megabytes=32):
+        self.engine = engine
+        self.seconds = seconds
+        self.workers = workers or multiprocessing.cpu_count()
+        self.megabytes = megabytes
+        if getattr(evaluate, '__self__', None) is engine:
+            evaluate = evaluate.__name__
+        self.evaluate = evaluate
+        self.table = None
+        self.finalizer = None
+
+    def __call__(self, player, board):
+        if self.table is None:
+            self.table = tt.SharedTranspositionTable(self.megabytes)
+            # A shared memory segment outlives the process unless unlinked,
+            # and the searchers in the shell's table of strategies are never
+            # closed.  (Worker processes do not inherit the finalizer.)
+            self.finalizer = multiprocessing.util.Finalize(self, self.table.unlink,
+                                                           exitpriority=0)
+        deadline = time.time() + self.seconds
+        self.table.new_search()
+        stop = multiprocessing.RawValue('b', 0)
+        results = multiprocessing.Queue()
+        depth = board.count(base.EMPTY)
+        engine_class = incremental.headless_class(self.engine)
+        workers = [multiprocessing.Process(
+                       target=smp_worker,
+                       args=(i, engine_class, self.evaluate, player, list(board), depth,
+                             self.table.name, self.table.size, self.table.generation, stop,
+                             results))
+                   for i in range(self.workers)]
+        for worker in workers:
+            worker.start()
+
+        best_depth, best_move = 0, self.engine.legal_moves(player, board)[0]
+        done = 0
+        while done < len(workers) and time.time() < deadline:
+            try:
+                d, val, move = results.get(timeout=max(0.0, deadline - time.time()))
+            except queue.Empty:
+                break
+            if d > best_depth:
+                best_depth, best_move = d, move
+            if d == depth:
+                # This worker has searched to the end of the game.
+                done += 1
+        stop.value = 1
+        # A process does not exit until what it put on a queue has been read,
+        # so the results are drained until every worker has finished, and
+        # only then are the workers joined.
+        while any(worker.is_alive() for worker in workers) or not results.empty():
+            try:
+                d, val, move = results.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            if d > best_depth:
+                best_depth, best_move = d, move
+        for worker in workers:
+            worker.join()
+        return best_move
+
+    def close(self):
+        """Free the shared transposition table."""
+        if self.table is not None:
+            self.finalizer()
+            self.table = self.finalizer = None
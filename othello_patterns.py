@@ -0,0 +1,216 @@
+"""
+A pattern-based evaluation, in the style of Logistello.
+
+`weighted_score` values each square on its own, but what a disc is worth
+depends on its neighbours: a C-square next to an empty corner is a liability,
+next to an owned one it is fine.  A pattern evaluation values whole lines and
+regions instead.  Each pattern is a fixed list of squares, and the contents of
+those squares--empty, the side to move's, or the opponent's--read as a base-3
+number give an index into a table of learned values.  The board's value is
+the sum of the table entries picked out by every pattern.
+
+The patterns are the standard ones: an edge with its two X-squares, the 3x3
+and 2x5 corner regions, the diagonals of length 4 to 8, and the second, third
+and fourth rows.  Every symmetric image of a pattern (rotations and
+reflections) shares its table, so `INSTANCES` lists 46 lists of squares
+reading 11 tables.  Since the best values change as the game goes on there is
+a set of tables for each phase, `PHASE_PLIES` plies long.
+
+The tables are one flat file of little-endian int16 values, phase by phase
+and pattern by pattern in `PATTERNS` order.  `PatternEvaluator` maps the file
+into memory rather than reading it, so starting up costs nothing however big
+the tables are, and processes evaluating with the same file share its pages.
+Without a file it starts from `seed_tables`, which spreads `SQUARE_WEIGHTS`
+over the patterns, so it plays like `weighted_score` until it is trained.  To
+start a tables file from the seed:
+
+    python othello_patterns.py --init othello_patterns.bin
+"""
+
+import argparse
+import mmap
+import operator
+import os
+import sys
+from array import array
+
+import othello_base as base
+import othello_symmetry as symmetry
+from othello_v0001 import MAX_VALUE, MIN_VALUE, SQUARE_WEIGHTS
+
+# -----------------------------------------------------------------------------
+## Patterns
+
+# (name, squares) in their top-left orientation.
+PATTERNS = (
+    ('edge+2x', (11, 12, 13, 14, 15, 16, 17, 18, 22, 27)),
+    ('corner3x3', (11, 12, 13, 21, 22, 23, 31, 32, 33)),
+    ('corner2x5', (11, 12, 13, 14, 15, 21, 22, 23, 24, 25)),
+    ('diag8', (11, 22, 33, 44, 55, 66, 77, 88)),
+    ('diag7', (12, 23, 34, 45, 56, 67, 78)),
+    ('diag6', (13, 24, 35, 46, 57, 68)),
+    ('diag5', (14, 25, 36, 47, 58)),
+    ('diag4', (15, 26, 37, 48)),
+    ('row2', (21, 22, 23, 24, 25, 26, 27, 28)),
+    ('row3', (31, 32, 33, 34, 35, 36, 37, 38)),
+    ('row4', (41, 42, 43, 44, 45, 46, 47, 48)),
+)
+
+# Table offsets within one phase, and the size of a phase's tables.
+TABLE_OFFSETS = []
+PHASE_SIZE = 0
+for _name, _squares in PATTERNS:
+    TABLE_OFFSETS.append(PHASE_SIZE)
+    PHASE_SIZE += 3 ** len(_squares)
+
+# (pattern number, squares) for every distinct image of every pattern.  Images
+# covering the same squares would only count the same discs twice.
+INSTANCES = []
+for _number, (_name, _squares) in enumerate(PATTERNS):
+    _seen = set()
+    for _symmetry in range(len(symmetry.SYMMETRIES)):
+        _image = tuple(symmetry.transform(sq, _symmetry) for sq in _squares)
+        if frozenset(_image) not in _seen:
+            _seen.add(frozenset(_image))
+            INSTANCES.append((_number, _image))
+
+PHASE_PLIES = 10
+PHASES = 6
+
+
+def phase(board):
+    """The table phase for a board, from the number of discs played."""
+    return min((60 - board[:100].count(base.EMPTY)) // PHASE_PLIES, PHASES - 1)
+
+
+# -----------------------------------------------------------------------------
+## Indexes
+
+# The squares of every instance end to end, read off a board with one
+# itemgetter call; each instance's digits are then a slice of the string.
+ALL_SQUARES = operator.itemgetter(*(sq for _, squares in INSTANCES for sq in squares))
+SLICES = []
+_start = 0
+for _number, _squares in INSTANCES:
+    SLICES.append((TABLE_OFFSETS[_number], _start, _start + len(_squares)))
+    _start += len(_squares)
+
+# Digits for each piece from each side: 0 empty, 1 own, 2 opponent's.
+DIGITS = {base.BLACK: str.maketrans({base.EMPTY: '0', base.BLACK: '1', base.WHITE: '2'}),
+          base.WHITE: str.maketrans({base.EMPTY: '0', base.BLACK: '2', base.WHITE: '1'})}
+
+
+def digits(player, board):
+    """The base-3 digits of every instance, from player's side, as one string."""
+    return ''.join(ALL_SQUARES(board)).translate(DIGITS[player])
+
+
+def indexes(player, board):
+    """The table index (within a phase) that each instance picks out."""
+    string = digits(player, board)
+    return [offset + int(string[start:end], 3) for offset, start, end in SLICES]
+
+
+# -----------------------------------------------------------------------------
+## Tables
+
+def seed_tables():
+    """
+    Tables that add up to `weighted_score` on every board (give or take the
+    rounding): each square's weight is split evenly among the instances
+    covering it.
+    """
+    coverage = [0] * 100
+    for _, squares in INSTANCES:
+        for sq in squares:
+            coverage[sq] += 1
+    phase_tables = array('h', bytes(2 * PHASE_SIZE))
+    for (name, squares), offset in zip(PATTERNS, TABLE_OFFSETS):
+        weights = [SQUARE_WEIGHTS[sq] / coverage[sq] for sq in squares]
+        for index in range(3 ** len(squares)):
+            value, rest = 0.0, index
+            for weight in reversed(weights):
+                rest, digit = divmod(rest, 3)
+                if digit == 1:
+                    value += weight
+                elif digit == 2:
+                    value -= weight
+            phase_tables[offset + index] = round(value)
+    return phase_tables * PHASES
+
+
+# Where `default_tables` looks for trained tables.
+TABLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'othello_patterns.bin')
+
+
+def default_tables():
+    """TABLES_PATH if there are tables there, otherwise None (the seed tables)."""
+    return TABLES_PATH if os.path.exists(TABLES_PATH) else None
+
+
+def write_tables(tables, path):
+    """Write tables (int16 values, PHASES * PHASE_SIZE of them) to a file."""
+    tables = array('h', tables)
+    if len(tables) != PHASES * PHASE_SIZE:
+        raise ValueError('expected %d table entries, got %d'
+                         % (PHASES * PHASE_SIZE, len(tables)))
+    if sys.byteorder != 'little':
+        tables.byteswap()
+    with open(path, 'wb') as out:
+        tables.tofile(out)
+
+
+def load_tables(path):
+    """
+    Map a tables file into memory and return it as a sequence of ints, or
+    the seed tables if path is None.
+    """
+    if path is None:
+        return seed_tables()
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size != 2 * PHASES * PHASE_SIZE:
+            raise ValueError('%s holds %d bytes, expected %d'
+                             % (path, size, 2 * PHASES * PHASE_SIZE))
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if sys.byteorder != 'little':
+        tables = array('h', data)
+        tables.byteswap()
+        return tables
+    return memoryview(data).cast('h')
+
+
+# -----------------------------------------------------------------------------
+## Evaluation
+
+class PatternEvaluator:
+    """
+    An evaluation function, called as evaluate(player, board) like
+    `weighted_score`, that sums the pattern tables in `path`.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.tables = load_tables(path)
+
+    def __call__(self, player, board):
+        tables = self.tables
+        base_offset = phase(board) * PHASE_SIZE
+        string = digits(player, board)
+        total = sum(tables[base_offset + offset + int(string[start:end], 3)]
+                    for offset, start, end in SLICES)
+        return max(MIN_VALUE + 1, min(MAX_VALUE - 1, total))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Make pattern tables for Othello.')
+    parser.add_argument('--init', metavar='PATH', required=True,
+                        help='write the seed tables (from the square weights) to PATH')
+    args = parser.parse_args()
+    write_tables(seed_tables(), args.init)
+    print('wrote %d patterns, %d instances, %d entries per phase, %d phases to %s'
+          % (len(PATTERNS), len(INSTANCES), PHASE_SIZE, PHASES, args.init))
+
+
+if __name__ == "__main__":
+    main()
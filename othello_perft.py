@@ -0,0 +1,167 @@
+"""
+Perft: count the positions reached by every sequence of moves to a given depth.
+
+Perft checks a move generator (the counts are known, and any bug in legal
+moves, flipping or passing changes them) and times it (nodes per second with no
+search or evaluation in the way).  Every engine--the list-based `OthelloBase`,
+the module-level `othello_paip`, `othello_bitboard.OthelloBitboard` on a
+`BitBoard` and the bare bitboard functions of `othello_bitboard`--should
+produce the same counts.
+
+A pass counts as a ply, and a finished game is a leaf wherever it ends.  With
+these rules the counts from the initial board are the published ones.
+
+    python othello_perft.py [--depth 7] [--position-depth 4] [--engine list ...]
+
+The run fails (exit status 1) if any count differs from its reference.
+"""
+
+import argparse
+import sys
+import time
+
+import othello_base as base
+import othello_bitboard as bitboard
+import othello_paip as paip
+
+# Perft from the initial board, Black to move.
+START_COUNTS = [1, 4, 12, 56, 244, 1396, 8200, 55092, 390216, 3005288, 24571284]
+
+# Stored positions, each the sequence of moves played from the initial board:
+# three midgames, and three endgames in which a pass comes within three plies.
+POSITIONS = [
+    [65, 46, 37, 64, 35, 66, 73, 74, 77, 47],
+    [65, 66, 43, 75, 76, 64, 56, 57, 77, 78, 58, 34, 73, 48, 53, 52, 42, 63, 61, 51,
+     46, 35],
+    [65, 46, 34, 63, 37, 56, 67, 28, 36, 76, 64, 27, 53, 58, 62, 47, 57, 43, 33, 52,
+     48, 74, 83, 72, 41, 66, 73, 42, 75, 77, 26, 22, 31, 32],
+    [56, 66, 43, 35, 46, 33, 64, 47, 76, 73, 34, 53, 65, 87, 75, 57, 74, 77, 42, 51,
+     37, 83, 32, 63, 25, 85, 31, 15, 48, 27, 67, 21, 16, 22, 26, 41, 14, 24, 86, 52,
+     68, 36, 84, 78, 82, 72, 58, 28],
+    [65, 64, 53, 62, 73, 56, 67, 82, 63, 75, 43, 32, 83, 84, 74, 33, 61, 42, 76, 85,
+     21, 58, 66, 22, 86, 35, 36, 57, 26, 34, 31, 77, 68, 78, 13, 27, 46, 47, 81, 52,
+     48, 23, 14, 38, 37, 72, 18, 17, 25, 12, 11, 16],
+    [34, 35, 46, 57, 56, 66, 37, 23, 68, 48, 36, 38, 58, 64, 26, 15, 53, 65, 28, 67,
+     76, 78, 24, 52, 12, 75, 43, 42, 74, 84, 17, 27, 31, 47, 83, 85, 61, 33, 86, 41,
+     77, 51, 14, 16, 22, 63, 73, 18, 25, 87, 88],
+]
+
+# Perft of each stored position to depths 0 to 5.
+POSITION_COUNTS = [
+    [1, 5, 55, 394, 4312, 35515],
+    [1, 10, 103, 1227, 12655, 162515],
+    [1, 15, 177, 2671, 29153, 425432],
+    [1, 11, 37, 318, 1200, 8131],
+    [1, 8, 12, 72, 106, 437],
+    [1, 7, 15, 89, 232, 1017],
+]
+
+
+def perft(engine, player, board, depth, passed=False):
+    """
+    Count the leaves `depth` plies below the board, with player to move.
+    `engine` is anything with `legal_moves`, `make_move` and `opponent`, and
+    board anything with `copy`.
+    """
+    if depth == 0:
+        return 1
+    moves = engine.legal_moves(player, board)
+    if not moves:
+        if passed:
+            return 1
+        return perft(engine, engine.opponent(player), board, depth - 1, True)
+    opp = engine.opponent(player)
+    nodes = 0
+    for move in moves:
+        nodes += perft(engine, opp, engine.make_move(move, player, board.copy()), depth - 1)
+    return nodes
+
+
+def perft_bits(own, opp, depth, passed=False):
+    """`perft` on (own, opp) bitboards, without converting to list boards."""
+    if depth == 0:
+        return 1
+    moves = bitboard.legal_bits(own, opp)
+    if not moves:
+        if passed:
+            return 1
+        return perft_bits(opp, own, depth - 1, True)
+    nodes = 0
+    while moves:
+        move = moves & -moves
+        moves ^= move
+        flips = bitboard.flip_bits(move, own, opp)
+        nodes += perft_bits(opp & ~flips, own | flips | move, depth - 1)
+    return nodes
+
+
+def bits_perft(player, board, depth):
+    """`perft_bits` from a list board."""
+    return perft_bits(*bitboard.to_bitboards(player, board), depth)
+
+
+def bitboard_perft(player, board, depth):
+    """`perft` with `OthelloBitboard`, from a list board."""
+    return perft(bitboard.OthelloBitboard(), player, bitboard.BitBoard.from_list(board), depth)
+
+
+# Each engine is a function perft(player, board, depth).
+ENGINES = {'list': lambda player, board, depth: perft(base.OthelloBase(), player, board, depth),
+           'paip': lambda player, board, depth: perft(paip, player, board, depth),
+           'bitboard': bitboard_perft,
+           'bits': bits_perft}
+
+
+def replay(engine, moves):
+    """Play moves from the initial board; return (player to move, board)."""
+    board = engine.initial_board()
+    player = base.BLACK
+    for move in moves:
+        engine.make_move(move, player, board)
+        player = engine.next_player(board, player)
+    return player, board
+
+
+def run(engine, depth, position_depth):
+    """
+    Time one engine on the initial board to `depth` and on the stored
+    positions to `position_depth`; return (nodes, seconds, mismatches).
+    """
+    count = ENGINES[engine]
+    list_engine = base.OthelloBase()
+    tasks = [(base.BLACK, list_engine.initial_board(), depth, START_COUNTS)]
+    tasks += [replay(list_engine, moves) + (position_depth, counts)
+              for moves, counts in zip(POSITIONS, POSITION_COUNTS)]
+    nodes, mismatches = 0, []
+    start = time.perf_counter()
+    for i, (player, board, d, counts) in enumerate(tasks):
+        n = count(player, board, d)
+        nodes += n
+        if d < len(counts) and n != counts[d]:
+            mismatches.append((i, d, n, counts[d]))
+    return nodes, time.perf_counter() - start, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Count and time Othello move generation.')
+    parser.add_argument('--depth', type=int, default=7,
+                        help='depth from the initial board')
+    parser.add_argument('--position-depth', type=int, default=4,
+                        help='depth from each stored position')
+    parser.add_argument('--engine', action='append', choices=sorted(ENGINES),
+                        help='engines to run (default all)')
+    args = parser.parse_args()
+
+    ok = True
+    print('%-10s %12s %9s %12s' % ('engine', 'nodes', 'seconds', 'nodes/s'))
+    for engine in args.engine or ENGINES:
+        nodes, seconds, mismatches = run(engine, args.depth, args.position_depth)
+        print('%-10s %12d %9.2f %12.0f' % (engine, nodes, seconds, nodes / seconds))
+        for i, d, n, expected in mismatches:
+            print('  position %d, depth %d: counted %d, expected %d' % (i, d, n, expected))
+            ok = False
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
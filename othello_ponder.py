@@ -0,0 +1,135 @@
+"""
+Pondering: searching on the opponent's time.
+
+A searcher sits idle while its opponent thinks, though it can usually guess
+what the opponent will play: its own search has just found the opponent's
+best reply, the second move of the principal variation.  `PonderingSearcher`
+plays like `timed_searcher`, and after choosing a move it goes on deepening,
+on a background thread, from the position that move and the expected reply
+lead to.  When it is next asked for a move:
+
+- *Ponder hit*: the opponent played the expected reply.  The background
+  search is kept and given the usual `seconds` more, so the move is as quick
+  as ever but searched as if it had had the opponent's thinking time too.
+- *Ponder miss*: the background search is stopped and a new one started.
+  The time was not all wasted: the two positions are a move apart and their
+  trees share many positions, already in the transposition table.
+
+When the opponent has to pass, the position after our own move is searched
+instead, which is a sure hit.
+
+The background search is a thread of the same process, so it shares the
+interpreter with whatever the opponent does meanwhile.  Against a person at
+the keyboard (the shell's `human`, blocked in `input`) or any opponent that
+mostly waits, it has the processor to itself; against another search in the
+same process the two split it, and the opponent's search gets slower (in a
+tournament, its recorded times include the pondering).  The background search
+runs on an engine of its own, a headless one, so it counts no nodes on the
+players' engine and draws nothing.  The play loops call `stop_pondering` when
+a game ends, however it ends, so no search outlives the game it was guessing
+about.
+"""
+
+import threading
+import time
+
+import othello_incremental as incremental
+import othello_ordering as ordering
+from othello_stats import SearchStats, principal_variation
+import othello_tt as tt
+from othello_v0001 import SQUARE_WEIGHTS, SearchTimeout
+
+
+class PonderingSearcher:
+    """
+    A strategy that deepens an alpha-beta search for `seconds` per move, like
+    `timed_searcher`, and keeps searching while the opponent thinks.
+    """
+
+    def __init__(self, engine, seconds, evaluate, table=None, orderer=None, stats=None):
+        self.engine = engine
+        self.ponder_engine = incremental.headless_class(engine)()
+        self.seconds = seconds
+        self.evaluate = evaluate
+        self.table = tt.TranspositionTable() if table is None else table
+        self.orderer = ordering.MoveOrderer(SQUARE_WEIGHTS) if orderer is None else orderer
+        self.stats = stats
+        # The background search fills its own stats, so that those of the
+        # move just played can still be shown; they are copied over on a hit.
+        self.ponder_stats = SearchStats() if stats is not None else None
+        self.deadline = 0.0
+        self.thread = None
+        self.position = None
+        self.result = None
+        self.hits = self.misses = 0
+
+    def __call__(self, player, board):
+        move = None
+        if self.thread is not None:
+            if self.position == (player, board[:100]):
+                self.hits += 1
+                self.deadline = time.time() + self.seconds
+                self.thread.join()
+                self.thread = None
+                move = self.result
+                if move is not None and self.stats is not None:
+                    vars(self.stats).update(vars(self.ponder_stats))
+            else:
+                self.misses += 1
+                self.stop_pondering()
+        if move is None:
+            self.deadline = time.time() + self.seconds
+            move = self.engine.deepen(player, board, self.timed_evaluate, self.table,
+                                      self.orderer, self.stats)
+        self.ponder(player, board, move)
+        return move
+
+    def timed_evaluate(self, player, board):
+        """The evaluation, raising SearchTimeout once the deadline has passed."""
+        if time.time() >= self.deadline:
+            raise SearchTimeout()
+        return self.evaluate(player, board)
+
+    def ponder(self, player, board, move):
+        """
+        Start searching, in the background, the position where player is next
+        to move after playing move on board, if the principal variation says
+        what it will be.
+        """
+        engine = self.engine
+        opponent = engine.opponent(player)
+        pv = principal_variation(engine, self.table, player, board, move, 2)
+        board = list(board)
+        engine.make_move(move, player, board)
+        following = engine.next_player(board, player)
+        if following is None:
+            return
+        if following == opponent:
+            if len(pv) < 2:
+                return
+            engine.make_move(pv[1], opponent, board)
+            if engine.next_player(board, opponent) != player:
+                return
+        self.position = (player, board[:100])
+        self.deadline = float('inf')
+        self.result = None
+        self.thread = threading.Thread(target=self.search_ahead, args=(player, board),
+                                       name='othello-ponder', daemon=True)
+        self.thread.start()
+
+    def search_ahead(self, player, board):
+        """The background search: runs until `stop_pondering` or a hit's deadline."""
+        try:
+            self.result = self.ponder_engine.deepen(player, board, self.timed_evaluate,
+                                                    self.table, self.orderer, self.ponder_stats)
+        except Exception:
+            # The next move is then simply searched from scratch, where any
+            # real error shows up again.
+            self.result = None
+
+    def stop_pondering(self):
+        """Abandon the background search, if there is one."""
+        if self.thread is not None:
+            self.deadline = 0.0
+            self.thread.join()
+            self.thread = None
@@ -0,0 +1,99 @@
+"""
+Compare the nodes searched by `alphabeta` and `pvs` on a fixed set of positions.
+
+Both searchers deepen iteratively with a fresh move orderer and transposition
+table for every position--PVS relies on the first move being good, and on the
+table to make its re-searches cheap--and must agree on the value of every
+position.  A node is one call to `legal_moves` (an interior node) or to the
+evaluation function (a leaf).
+
+    python othello_pvs_bench.py [depth]
+"""
+
+import sys
+import time
+
+import othello_base as base
+import othello_ordering as ordering
+import othello_tt as tt
+import othello_v0001 as ob
+
+# Each position is the sequence of moves played from the initial board.
+POSITIONS = [
+    [65, 46, 37, 64, 35, 66, 73, 74, 77, 47],
+    [43, 53, 65, 35, 52, 66, 67, 46, 33, 75, 76, 51, 84, 23, 32, 77],
+    [65, 66, 43, 75, 76, 64, 56, 57, 77, 78, 58, 34, 73, 48, 53, 52, 42, 63, 61, 51,
+     46, 35],
+    [65, 46, 34, 23, 35, 24, 25, 56, 37, 64, 57, 68, 22, 28, 53, 15, 75, 52, 42, 21,
+     43, 63, 26, 41, 48, 86, 66, 74],
+    [65, 46, 34, 63, 37, 56, 67, 28, 36, 76, 64, 27, 53, 58, 62, 47, 57, 43, 33, 52,
+     48, 74, 83, 72, 41, 66, 73, 42, 75, 77, 26, 22, 31, 32],
+    [56, 46, 37, 67, 57, 64, 34, 36, 43, 32, 63, 25, 73, 47, 33, 65, 24, 74, 85, 83,
+     53, 38, 78, 82, 21, 22, 26, 14, 66, 27, 17, 72, 84, 86, 12, 52, 23, 16, 62, 51],
+    [43, 33, 23, 35, 66, 42, 51, 64, 25, 22, 63, 26, 73, 65, 11, 15, 46, 13, 24, 21,
+     17, 72, 75, 76, 77, 85, 62, 52, 86, 36, 71, 41, 37, 57, 47, 82, 67, 74, 84, 88,
+     34, 58, 61, 56, 87, 53],
+    [43, 33, 34, 53, 64, 35, 56, 63, 24, 67, 72, 13, 22, 65, 14, 25, 66, 76, 52, 81,
+     12, 41, 73, 62, 75, 84, 26, 46, 68, 11, 71, 57, 74, 51, 82, 17, 32, 78, 27, 42,
+     31, 21, 37, 15, 77, 48, 36, 85, 28, 61, 88, 47],
+]
+
+
+def replay(engine, moves):
+    """Play moves from the initial board; return (player to move, board)."""
+    board = engine.initial_board()
+    player = base.BLACK
+    for move in moves:
+        engine.make_move(move, player, board)
+        player = engine.next_player(board, player)
+    return player, board
+
+
+def count_nodes(engine, search, player, board, depth, evaluate):
+    """
+    Search depths 1 to `depth` in turn (sharing one table and orderer, as
+    `timed_searcher` does); return (value, move, nodes, seconds).
+    """
+    nodes = [0]
+    legal_moves = engine.legal_moves
+
+    def counting_legal_moves(player, board):
+        nodes[0] += 1
+        return legal_moves(player, board)
+
+    def counting_evaluate(player, board):
+        nodes[0] += 1
+        return evaluate(player, board)
+
+    table = tt.TranspositionTable(4)
+    orderer = ordering.MoveOrderer(ob.SQUARE_WEIGHTS)
+    engine.legal_moves = counting_legal_moves
+    try:
+        start = time.time()
+        for d in range(1, depth + 1):
+            val, move = search(player, list(board), ob.MIN_VALUE, ob.MAX_VALUE, d,
+                               counting_evaluate, table, orderer=orderer)
+        elapsed = time.time() - start
+    finally:
+        del engine.legal_moves
+    return val, move, nodes[0], elapsed
+
+
+def main(depth=5):
+    engine = ob.Strategies()
+    totals = [0, 0]
+    print('%3s %6s %10s %10s %7s' % ('#', 'empty', 'alphabeta', 'pvs', 'ratio'))
+    for i, moves in enumerate(POSITIONS):
+        player, board = replay(engine, moves)
+        ab = count_nodes(engine, engine.alphabeta, player, board, depth, engine.weighted_score)
+        pvs = count_nodes(engine, engine.pvs, player, board, depth, engine.weighted_score)
+        if ab[0] != pvs[0]:
+            raise AssertionError('position %d: alphabeta says %d, pvs says %d' % (i, ab[0], pvs[0]))
+        totals[0] += ab[2]
+        totals[1] += pvs[2]
+        print('%3d %6d %10d %10d %7.3f' % (i, board.count(base.EMPTY), ab[2], pvs[2], pvs[2] / ab[2]))
+    print('%10s %10d %10d %7.3f' % ('total', totals[0], totals[1], totals[1] / totals[0]))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
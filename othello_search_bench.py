@@ -0,0 +1,173 @@
+"""
+A reproducible benchmark of the searchers on a fixed set of positions.
+
+Each searcher is built fresh for every position (so tables and move orderers
+start empty) and asked for one move at a fixed depth.  For every run the
+benchmark records the nodes searched, the time taken, nodes per second, the
+effective branching factor (nodes ** (1 / depth)) and the move chosen.  A node
+is one call to `legal_moves` or to the evaluation function.
+
+Results are written one JSON object per line.  Given a baseline file from an
+earlier run, the benchmark compares against it and fails (exit status 1) when
+a run searched more nodes, or took longer, than the baseline allows:
+
+    python othello_search_bench.py --out baseline.jsonl
+    ... change the evaluation or the move ordering ...
+    python othello_search_bench.py --baseline baseline.jsonl
+
+Node counts do not depend on the machine, so their threshold is tight; times
+do, so compare times only against a baseline made on the same machine.  Runs
+shorter than `MIN_SECONDS` are too noisy to compare times at all.
+
+To find where the time goes, profile one searcher on one position:
+
+    python othello_search_bench.py --searcher pvs --position midgame-34 --profile pvs.prof
+"""
+
+import argparse
+import cProfile
+import json
+import pstats
+import sys
+import time
+
+import othello_base as base
+import othello_ordering as ordering
+import othello_pvs_bench as pvs_bench
+import othello_tournament as tournament
+import othello_tt as tt
+import othello_v0001 as ob
+
+# The start, and positions from the opening, middle game and endgame, each
+# the sequence of moves played from the initial board.
+POSITIONS = [('start', [])] + [('%s-%d' % ('opening' if len(moves) <= 20 else
+                                           'midgame' if len(moves) < 44 else 'endgame',
+                                           len(moves)), moves)
+                               for moves in pvs_bench.POSITIONS]
+
+# (name, depth, make): make(engine, depth, evaluate) builds the strategy.
+SEARCHERS = [
+    ('minimax', 4,
+     lambda engine, depth, evaluate: engine.minimax_searcher(depth, evaluate)),
+    ('alphabeta', 5,
+     lambda engine, depth, evaluate: engine.alphabeta_searcher(depth, evaluate)),
+    ('alphabeta-ordered', 7,
+     lambda engine, depth, evaluate: engine.alphabeta_searcher(
+         depth, evaluate, tt.TranspositionTable(4), ordering.MoveOrderer(ob.SQUARE_WEIGHTS))),
+    ('pvs', 7,
+     lambda engine, depth, evaluate: engine.pvs_searcher(
+         depth, evaluate, tt.TranspositionTable(4), ordering.MoveOrderer(ob.SQUARE_WEIGHTS))),
+    ('mtdf', 7,
+     lambda engine, depth, evaluate: engine.mtdf_searcher(
+         depth, evaluate, tt.TranspositionTable(4), ordering.MoveOrderer(ob.SQUARE_WEIGHTS))),
+]
+
+# Baseline runs shorter than this many seconds are not compared on time.
+MIN_SECONDS = 0.05
+
+
+def bench(engine, name, depth, make, position, moves, profiler=None):
+    """
+    Run one searcher on one position; return the result record.  The move
+    decision alone is profiled if a `cProfile.Profile` is given.
+    """
+    player, board = pvs_bench.replay(engine, moves)
+
+    def counting_evaluate(player, board):
+        engine.nodes += 1
+        return engine.weighted_score(player, board)
+
+    strategy = make(engine, depth, counting_evaluate)
+    engine.nodes = 0
+    if profiler is not None:
+        profiler.enable()
+    start = time.perf_counter()
+    move = strategy(player, list(board))
+    seconds = time.perf_counter() - start
+    if profiler is not None:
+        profiler.disable()
+    return {'searcher': name, 'position': position, 'empty': board.count(base.EMPTY),
+            'depth': depth, 'move': move, 'nodes': engine.nodes,
+            'seconds': round(seconds, 4), 'nps': round(engine.nodes / seconds),
+            'ebf': round(engine.nodes ** (1 / depth), 2)}
+
+
+def run(searchers=None, positions=None, profiler=None):
+    """Run the chosen searchers on the chosen positions (by default all)."""
+    engine = tournament.HeadlessEngine()
+    return [bench(engine, name, depth, make, position, moves, profiler)
+            for name, depth, make in SEARCHERS if searchers is None or name in searchers
+            for position, moves in POSITIONS if positions is None or position in positions]
+
+
+def compare(results, baseline, threshold=0.05, time_threshold=0.25):
+    """
+    Compare results with a baseline; return a list of (regression, message),
+    where regression is False for differences that are only worth noting.
+    """
+    old = {(r['searcher'], r['position'], r['depth']): r for r in baseline}
+    notes = []
+    for r in results:
+        b = old.get((r['searcher'], r['position'], r['depth']))
+        if b is None:
+            continue
+        where = '%s on %s at depth %d' % (r['searcher'], r['position'], r['depth'])
+        if r['nodes'] > b['nodes'] * (1 + threshold):
+            notes.append((True, '%s: %d nodes, baseline %d' % (where, r['nodes'], b['nodes'])))
+        if b['seconds'] >= MIN_SECONDS and r['seconds'] > b['seconds'] * (1 + time_threshold):
+            notes.append((True, '%s: %.3f s, baseline %.3f s' % (where, r['seconds'],
+                                                                 b['seconds'])))
+        if r['move'] != b['move']:
+            notes.append((False, '%s: plays %d, baseline %d' % (where, r['move'], b['move'])))
+    return notes
+
+
+def print_results(results):
+    print('%-18s %-12s %5s %5s %5s %9s %8s %9s %6s'
+          % ('searcher', 'position', 'empty', 'depth', 'move', 'nodes', 'seconds', 'nodes/s',
+             'ebf'))
+    for r in results:
+        print('%-18s %-12s %5d %5d %5d %9d %8.3f %9d %6.2f'
+              % (r['searcher'], r['position'], r['empty'], r['depth'], r['move'], r['nodes'],
+                 r['seconds'], r['nps'], r['ebf']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Othello searchers.')
+    parser.add_argument('--searcher', action='append',
+                        choices=[name for name, _, _ in SEARCHERS],
+                        help='searchers to run (default all)')
+    parser.add_argument('--position', action='append',
+                        choices=[name for name, _ in POSITIONS],
+                        help='positions to search (default all)')
+    parser.add_argument('--out', default='search_bench.jsonl',
+                        help='file to write the results to')
+    parser.add_argument('--baseline', help='results file of an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.05,
+                        help='allowed fractional increase in nodes')
+    parser.add_argument('--time-threshold', type=float, default=0.25,
+                        help='allowed fractional increase in time')
+    parser.add_argument('--profile',
+                        help='file to write a cProfile of the move decisions to')
+    args = parser.parse_args()
+
+    profiler = cProfile.Profile() if args.profile else None
+    results = run(args.searcher, args.position, profiler)
+    print_results(results)
+    if profiler is not None:
+        profiler.dump_stats(args.profile)
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+    with open(args.out, 'w') as out:
+        for r in results:
+            out.write(json.dumps(r, separators=(',', ':')) + '\n')
+    if args.baseline:
+        notes = compare(results, tournament.load(args.baseline), args.threshold,
+                        args.time_threshold)
+        for regression, message in notes:
+            print(('REGRESSION ' if regression else 'note       ') + message)
+        if any(regression for regression, _ in notes):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,20 @@
+import sys
+
 import othello_v0001 as ob
-othello=ob.v0001()
+import othello_book as book
+import othello_eval as evaluation
+import othello_incremental as incremental
+import othello_ordering as ordering
+import othello_parallel as parallel
+import othello_patterns as patterns
+import othello_ponder as ponder
+import othello_stats as stats
+import othello_tt as tt
+
+# The engine and strategy table are made by `setup`, so that importing this
+# module (to reuse `build_options`, say) does not open a window.
+othello = None
+options = {}
 
 def human(player, board):
     print(othello.print_board(board))
@@ -11,16 +26,73 @@ def human(player, board):
         elif move:
             print('Illegal move--try again.')
 
-options = {'human': human,
-           'random': othello.random_strategy,
-           'max-diff': othello.maximizer(othello.score),
-           'max-weighted-diff': othello.maximizer(othello.weighted_score),
-           'minimax-diff': othello.minimax_searcher(3, othello.score),
-           'minimax-weighted-diff':
-               othello.minimax_searcher(3, othello.weighted_score),
-           'ab-diff': othello.alphabeta_searcher(3, othello.score),
-           'ab-weighted-diff':
-               othello.alphabeta_searcher(3, othello.weighted_score)}
+def reporting(strategy):
+    """Print a strategy's search statistics after each of its moves."""
+    def report(player, board):
+        move = strategy(player, board)
+        print(strategy.stats.report())
+        return move
+    report.stats = strategy.stats
+    return report
+
+def build_options(othello):
+    """The table of named strategies, built on the given engine."""
+    # The -bitboard strategies search on an engine of their own, which keeps
+    # its positions in bitboards; they play on `othello` like any other.
+    bits = ob.BitboardEngine()
+    return {'human': human,
+            'random': othello.random_strategy,
+            'max-diff': othello.maximizer(othello.score),
+            'max-weighted-diff': othello.maximizer(othello.weighted_score),
+            'minimax-diff': othello.minimax_searcher(3, othello.score),
+            'minimax-weighted-diff':
+                othello.minimax_searcher(3, othello.weighted_score),
+            'ab-diff': othello.alphabeta_searcher(3, othello.score),
+            'ab-weighted-diff':
+                othello.alphabeta_searcher(3, othello.weighted_score),
+            'ab-weighted-diff-bitboard':
+                bits.alphabeta_searcher(3, bits.weighted_score),
+            'ab-features':
+                othello.alphabeta_searcher(3, evaluation.FeatureEvaluator()),
+            'ab-patterns':
+                othello.alphabeta_searcher(
+                    3, patterns.PatternEvaluator(patterns.default_tables())),
+            'pvs-weighted-diff':
+                othello.pvs_searcher(3, othello.weighted_score,
+                                     orderer=ordering.MoveOrderer(ob.SQUARE_WEIGHTS)),
+            'mtdf-weighted-diff':
+                othello.mtdf_searcher(3, othello.weighted_score),
+            'timed-weighted-diff':
+                othello.timed_searcher(2, othello.weighted_score),
+            'timed-weighted-diff-bitboard':
+                bits.timed_searcher(2, bits.weighted_score),
+            'timed-weighted-stats':
+                reporting(othello.timed_searcher(2, othello.weighted_score,
+                                                 stats=stats.SearchStats())),
+            'parallel-ab-weighted-diff':
+                parallel.RootParallelSearcher(othello, 5, othello.weighted_score),
+            'smp-weighted-diff':
+                parallel.LazySMPSearcher(othello, othello.weighted_score, 2),
+            'ponder-timed-weighted-diff':
+                ponder.PonderingSearcher(othello, 2, othello.weighted_score),
+            'book-timed-weighted-diff':
+                othello.book_searcher(othello.timed_searcher(2, othello.weighted_score),
+                                      book.OpeningBook(book.default_book()), randomness=1),
+            'ab-weighted-endgame':
+                othello.endgame_searcher(othello.alphabeta_searcher(3, othello.weighted_score))}
+
+def setup(engine=None, headless=False):
+    """
+    Make the shell's engine and options: the given engine, or else a GUI
+    engine, or with headless=True one that never loads pygame.
+    """
+    global othello, options
+    if engine is None:
+        engine = (incremental.HeadlessIncrementalEngine() if headless
+                  else incremental.IncrementalEngine())
+    othello = engine
+    options = build_options(othello)
+    return othello
 
 def check(move, player, board):
     return othello.is_valid(move) and othello.is_legal(move, player, board)
@@ -43,25 +115,33 @@ def get_players():
     white = get_choice('WHITE: choose a strategy', options)
     return black, white
 
-def main(black_choice = None, white_choice = None, black_name="Black", white_name="White"):
+def main(black_choice = None, white_choice = None, black_name="Black", white_name="White",
+         headless=False):
+    if othello is None:
+        setup(headless=headless)
     try:
         if (black_choice == None or white_choice == None):
             #black, white = get_players()
-            black, white = othello.alphabeta_searcher(8, othello.weighted_score), \
-                           othello.alphabeta_searcher(8, othello.weighted_score)
+            black, white = [othello.endgame_searcher(
+                                othello.alphabeta_searcher(8, othello.weighted_score, tt.TranspositionTable(),
+                                                           ordering.MoveOrderer(ob.SQUARE_WEIGHTS)))
+                            for _ in range(2)]
             black_name, white_name = "Alpha-Beta 8", "Alpha-Beta 8"
             #black, white = othello.random_strategy, othello.maximizer(othello.score)
         else:
             (black, white) = [options[k] for k in (black_choice, white_choice)]
-        board, score1 = othello.play(black, white, black_name, white_name)
-        #board, score2 = othello.play(black, white, black_name, white_name)
-        #board, score3 = othello.play(black, white, black_name, white_name)
-        othello.end_wait()
+        if headless:
+            board, score1 = othello.play(black, white)
+        else:
+            board, score1 = othello.play(black, white, black_name, white_name)
+            #board, score2 = othello.play(black, white, black_name, white_name)
+            #board, score3 = othello.play(black, white, black_name, white_name)
+            othello.end_wait()
 
     except othello.IllegalMoveError as e:
         print(e)
         return
-    except EOFError as e:
+    except (EOFError, othello.WindowClosed):
         print('Goodbye.')
         return
     print('Final score:', score1)
@@ -69,4 +149,4 @@ def main(black_choice = None, white_choice = None, black_name="Black", white_nam
     print(othello.print_board(board))
 
 if __name__=="__main__":
-    main()
\ No newline at end of file
+    main(headless='--headless' in sys.argv)
\ No newline at end of file
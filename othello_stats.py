@@ -0,0 +1,140 @@
+"""
+Statistics about what a search did, and profiling of single move decisions.
+
+Pass a `SearchStats` to a searcher (`alphabeta_searcher(..., stats=stats)` and
+the like) and after every move decision it holds:
+
+- `nodes`: positions visited at each ply from the root (leaves included);
+- `leaves`: calls to the evaluation function;
+- `passes`: positions where the side to move had to pass;
+- `cutoffs` and `cutoff_indexes`: beta cutoffs, and how many happened on the
+  first move tried, the second, and so on;
+- `probes` and `hits`: transposition table lookups, and how many found
+  their position;
+- `iterations`: (depth, value, move, seconds, nodes) for each depth searched;
+- `pv`: the principal variation, read back from the transposition table.
+
+Without a `stats` object the searchers only pay for one `is None` test per
+node.  The strategy a searcher returns carries its stats object as
+`strategy.stats`, which is how the shell and the GUI find it to display.
+"""
+
+import cProfile
+import pstats
+import time
+
+import othello_tt as tt
+
+
+class SearchStats:
+    """Counters filled in by a searcher during one move decision."""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Reset every counter."""
+        self.nodes = []
+        self.leaves = self.passes = self.cutoffs = 0
+        self.cutoff_indexes = []
+        self.probes = self.hits = 0
+        self.iterations = []
+        self.pv = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self.table = None
+        self.table_counts = (0, 0)
+
+    def start(self, table=None):
+        """Begin a move decision, searched with `table` if one is given."""
+        self.clear()
+        self.table = table
+        if table is not None:
+            self.table_counts = (table.probes, table.hits)
+
+    def node(self, ply):
+        """Count a position visited at `ply`."""
+        nodes = self.nodes
+        while len(nodes) <= ply:
+            nodes.append(0)
+        nodes[ply] += 1
+
+    def cutoff(self, index):
+        """Count a beta cutoff by the `index`th move tried."""
+        self.cutoffs += 1
+        indexes = self.cutoff_indexes
+        while len(indexes) <= index:
+            indexes.append(0)
+        indexes[index] += 1
+
+    def iteration(self, depth, value, move):
+        """Record that a search to `depth` has finished."""
+        self.iterations.append((depth, value, move, time.perf_counter() - self.started,
+                                sum(self.nodes)))
+
+    def finish(self, engine, player, board, move):
+        """End a move decision: read the clock, the table counters and the PV."""
+        self.elapsed = time.perf_counter() - self.started
+        if self.table is not None:
+            self.probes = self.table.probes - self.table_counts[0]
+            self.hits = self.table.hits - self.table_counts[1]
+        depth = self.iterations[-1][0] if self.iterations else 1
+        self.pv = principal_variation(engine, self.table, player, board, move, depth)
+
+    def hit_rate(self):
+        """Fraction of table probes that found their position."""
+        return self.hits / self.probes if self.probes else 0.0
+
+    def report(self):
+        """A few lines summing up the last move decision."""
+        total = sum(self.nodes)
+        lines = ['%d nodes in %.3f s (%.0f nodes/s), %d leaves, %d passes'
+                 % (total, self.elapsed, total / self.elapsed if self.elapsed else 0,
+                    self.leaves, self.passes),
+                 'nodes per ply: %s' % ' '.join(map(str, self.nodes)),
+                 'cutoffs: %d, by move index: %s'
+                 % (self.cutoffs, ' '.join(map(str, self.cutoff_indexes)))]
+        if self.probes:
+            lines.append('table: %d probes, %.1f%% hits' % (self.probes, 100 * self.hit_rate()))
+        for depth, value, move, seconds, nodes in self.iterations:
+            lines.append('depth %2d: value %6s, move %s, %.3f s, %d nodes'
+                         % (depth, value, move, seconds, nodes))
+        lines.append('pv: %s' % ' '.join(map(str, self.pv)))
+        return '\n'.join(lines)
+
+
+def principal_variation(engine, table, player, board, move, depth):
+    """
+    The expected line of play from board, starting with `move` and following
+    the best moves stored in `table` for at most `depth` plies.
+    """
+    pv = []
+    board = list(board)
+    while move is not None and len(pv) < depth and engine.is_legal(move, player, board):
+        pv.append(move)
+        engine.make_move(move, player, board)
+        player = engine.next_player(board, player)
+        if player is None or table is None:
+            break
+        entry = table.get(tt.zobrist_key(player, board))
+        move = entry[4] if entry is not None else None
+    return pv
+
+
+def profile_move(strategy, player, board, path=None, limit=25):
+    """
+    Run cProfile over one move decision of `strategy` and return the move.
+    The profile is written to `path` (for `pstats` or snakeviz) if given, and
+    otherwise its `limit` most expensive functions are printed.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        move = strategy(player, list(board))
+    finally:
+        profiler.disable()
+    if path is not None:
+        profiler.dump_stats(path)
+    else:
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(limit)
+    return move
@@ -0,0 +1,126 @@
+"""
+The eight symmetries of the board, and canonical forms of positions.
+
+Rotating or reflecting an Othello position gives a position that is just as
+good for the same side, with the moves rotated or reflected to match; the
+start is even symmetric itself.  So anything keyed by position--a book, a
+cache, a set of training positions--can store one entry for all eight images
+by keying on a canonical one.  The canonical image here is the one with the
+smallest (own, opponent) pair of bitboards (`othello_bitboard` layout), and
+`canonical` returns it as one 128-bit key, own bits first.
+
+The images of a bitboard are computed with a byte swap (flipping the rows)
+and delta swaps (mirroring the columns, and transposing), a few dozen integer
+operations for all eight, rather than by moving squares one at a time.
+
+Symmetries are numbered as in `SYMMETRIES`; `SQUARE_MAPS[s]` takes a list
+board square to its image under symmetry s and `INVERSE_MAPS[s]` takes it
+back, so a move found in the canonical frame is played as
+`INVERSE_MAPS[s][move]`.
+"""
+
+from othello_bitboard import SQUARE_TO_BIT, to_bitboards
+
+# The eight symmetries, as maps of (row, col), each 0 to 7: the identity,
+# rotations by 90, 180 and 270 degrees, a mirror across the columns and one
+# across the rows, the transpose and the anti-transpose.
+SYMMETRIES = (
+    lambda r, c: (r, c),
+    lambda r, c: (c, 7 - r),
+    lambda r, c: (7 - r, 7 - c),
+    lambda r, c: (7 - c, r),
+    lambda r, c: (r, 7 - c),
+    lambda r, c: (7 - r, c),
+    lambda r, c: (c, r),
+    lambda r, c: (7 - c, 7 - r),
+)
+
+SQUARE_MAPS = []
+INVERSE_MAPS = []
+for _symmetry in SYMMETRIES:
+    _forward, _back = list(range(100)), list(range(100))
+    for _sq in SQUARE_TO_BIT:
+        _r, _c = _symmetry(_sq // 10 - 1, _sq % 10 - 1)
+        _image = 10 * (_r + 1) + _c + 1
+        _forward[_sq], _back[_image] = _image, _sq
+    SQUARE_MAPS.append(_forward)
+    INVERSE_MAPS.append(_back)
+
+
+def transform(square, symmetry):
+    """The square that a symmetry (a `SYMMETRIES` index) takes square to."""
+    return SQUARE_MAPS[symmetry][square]
+
+
+# -----------------------------------------------------------------------------
+## Bitboards
+
+def flip_rows(bits):
+    """Row r goes to row 7 - r: the bytes in reverse order."""
+    return int.from_bytes(bits.to_bytes(8, 'little'), 'big')
+
+
+def mirror_columns(bits):
+    """Column c goes to column 7 - c: the bits of every byte in reverse order."""
+    bits = ((bits >> 1) & 0x5555555555555555) | ((bits & 0x5555555555555555) << 1)
+    bits = ((bits >> 2) & 0x3333333333333333) | ((bits & 0x3333333333333333) << 2)
+    return ((bits >> 4) & 0x0f0f0f0f0f0f0f0f) | ((bits & 0x0f0f0f0f0f0f0f0f) << 4)
+
+
+def transpose(bits):
+    """Square (r, c) goes to (c, r)."""
+    t = 0x0f0f0f0f00000000 & (bits ^ (bits << 28))
+    bits ^= t ^ (t >> 28)
+    t = 0x3333000033330000 & (bits ^ (bits << 14))
+    bits ^= t ^ (t >> 14)
+    t = 0x5500550055005500 & (bits ^ (bits << 7))
+    return bits ^ t ^ (t >> 7)
+
+
+def images(bits):
+    """The images of a bitboard under each of the eight symmetries, in order."""
+    t = transpose(bits)
+    mt = mirror_columns(t)
+    m = mirror_columns(bits)
+    return (bits, mt, flip_rows(m), flip_rows(t), m, flip_rows(bits), t, flip_rows(mt))
+
+
+def transform_bits(bits, symmetry):
+    """The image of a bitboard under one symmetry."""
+    return images(bits)[symmetry]
+
+
+# -----------------------------------------------------------------------------
+## Canonical positions
+
+def canonical(own, opp):
+    """
+    The canonical key of the position with bitboards (own, opp), and the
+    symmetries that take the position to it.  The first is the transform to
+    use; there are more only when the position is itself symmetric.
+    """
+    keys = [o << 64 | p for o, p in zip(images(own), images(opp))]
+    key = min(keys)
+    if keys.count(key) == 1:
+        return key, (keys.index(key),)
+    return key, tuple(s for s, k in enumerate(keys) if k == key)
+
+
+def canonical_board(player, board):
+    """`canonical` for a list board with player to move."""
+    return canonical(*to_bitboards(player, board))
+
+
+def canonical_move(move, symmetries):
+    """
+    A list board move in the canonical frame.  In a symmetric position, moves
+    that are images of each other are one move, so they get the same square.
+    """
+    if len(symmetries) == 1:
+        return SQUARE_MAPS[symmetries[0]][move]
+    return min(SQUARE_MAPS[s][move] for s in symmetries)
+
+
+def original_move(move, symmetries):
+    """A canonical-frame move taken back to the frame of the original board."""
+    return INVERSE_MAPS[symmetries[0]][move]
@@ -0,0 +1,70 @@
+"""
+Board geometry, computed once at import.
+
+The list board walks from a square in a direction until it falls off the edge
+onto an OUTER square.  Every walk from a given square in a given direction
+visits the same squares, so they are listed here once, as tuples of board
+indexes:
+
+- `SQUARES`: the 64 playable squares, in index order, and `SQUARE_SET` for
+  membership tests;
+- `DIRECTION_RAYS[sq][d]`: the squares reached from `sq` by repeatedly adding
+  direction `d`, up to the edge of the board (not including `sq`);
+- `RAYS[sq]`: the rays from `sq` that are long enough to hold a bracket--an
+  opponent's piece followed by one of ours--so at least two squares long;
+- `NEIGHBORS[sq]`: the playable squares next to `sq`;
+- `CORNERS` and `EDGE_RAYS`: the four corners, and for each corner the two
+  rays that run along the edges from it;
+- `SQUARE_WEIGHTS`: the value of holding each square, for `weighted_score`.
+
+This module only depends on the 10x10 layout, so both `othello_base` and
+`othello_paip` can use it.
+"""
+
+# The offsets of `othello_base.DIRECTIONS`: up, up-right, right, down-right,
+# down, down-left, left and up-left.
+DIRECTIONS = (-10, -9, 1, 11, 10, 9, -1, -11)
+
+SQUARES = tuple(sq for sq in range(11, 89) if 1 <= sq % 10 <= 8)
+SQUARE_SET = frozenset(SQUARES)
+
+
+def ray(square, direction):
+    """The squares from square (exclusive) to the edge in a direction."""
+    squares = []
+    square += direction
+    while square in SQUARE_SET:
+        squares.append(square)
+        square += direction
+    return tuple(squares)
+
+
+DIRECTION_RAYS = [None] * 100
+RAYS = [()] * 100
+for _sq in SQUARES:
+    DIRECTION_RAYS[_sq] = {d: ray(_sq, d) for d in DIRECTIONS}
+    RAYS[_sq] = tuple(r for r in DIRECTION_RAYS[_sq].values() if len(r) >= 2)
+
+NEIGHBORS = [()] * 100
+for _sq in SQUARES:
+    NEIGHBORS[_sq] = tuple(_sq + d for d in DIRECTIONS if _sq + d in SQUARE_SET)
+
+CORNERS = (11, 18, 81, 88)
+EDGE_RAYS = {corner: tuple(DIRECTION_RAYS[corner][d] for d in (-10, 1, 10, -1)
+                           if DIRECTION_RAYS[corner][d])
+             for corner in CORNERS}
+
+# Corners and (most) edges are worth having; the squares next to the corners
+# give them away.
+SQUARE_WEIGHTS = [
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 120, -20, 20, 5, 5, 20, -20, 120, 0,
+    0, -20, -40, -5, -5, -5, -5, -40, -20, 0,
+    0, 20, -5, 15, 3, 3, 15, -5, 20, 0,
+    0, 5, -5, 3, 3, 3, 3, -5, 5, 0,
+    0, 5, -5, 3, 3, 3, 3, -5, 5, 0,
+    0, 20, -5, 15, 3, 3, 15, -5, 20, 0,
+    0, -20, -40, -5, -5, -5, -5, -40, -20, 0,
+    0, 120, -20, 20, 5, 5, 20, -20, 120, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+]
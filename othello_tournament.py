@@ -0,0 +1,265 @@
+"""
+Headless tournaments between the strategies in `othello_shell`.
+
+Games are played without a window, images or sound, optionally spread over a
+pool of worker processes, and each game is written as one line of JSON:
+
+    {"black": "ab-diff", "white": "random", "score": 20,
+     "moves": "564346...", "times": [3, 0, ...], "nodes": [61, 0, ...]}
+
+`score` is Black's disc differential, `moves` the squares played (two digits
+each), and `times` (milliseconds) and `nodes` are per move.  A node is one call
+to `legal_moves` in the playing process, so work done by the parallel
+strategies' own workers is not counted, nor is a pondering strategy's search
+on its opponent's time.  Times are wall-clock times, though, so an opponent's
+include whatever share of the processor the pondering took from it.
+
+Each pairing is played as pairs of games with the colors swapped.  Both games of
+a pair start from the same opening: `random_plies` random moves from the
+initial board, which keeps deterministic strategies from replaying one game.
+
+    python othello_tournament.py round-robin ab-diff ab-weighted-diff random
+    python othello_tournament.py gauntlet mtdf-weighted-diff ab-diff pvs-weighted-diff
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import random
+import time
+
+import othello_base as base
+import othello_incremental as incremental
+import othello_shell as shell
+
+
+class HeadlessEngine(incremental.HeadlessIncrementalEngine):
+    """The headless engine, counting the nodes its searches visit."""
+
+    # Only searches on this engine count: a pondering strategy's background
+    # search runs on an engine of its own.
+    nodes = 0
+
+    def legal_moves(self, player, board):
+        self.nodes += 1
+        return super().legal_moves(player, board)
+
+
+# -----------------------------------------------------------------------------
+## Playing games
+
+def random_opening(engine, plies, rng):
+    """A list of `plies` random moves from the initial board."""
+    board, player, moves = engine.initial_board(), base.BLACK, []
+    while player is not None and len(moves) < plies:
+        move = rng.choice(engine.legal_moves(player, board))
+        engine.make_move(move, player, board)
+        moves.append(move)
+        player = engine.next_player(board, player)
+    return moves
+
+
+def play_game(engine, black, white, strategies, opening=()):
+    """Play one game between two named strategies; return its record."""
+    board, player = engine.initial_board(), base.BLACK
+    for move in opening:
+        engine.make_move(move, player, board)
+        player = engine.next_player(board, player)
+    record = {'black': black, 'white': white, 'opening': len(opening),
+              'moves': ''.join(map(str, opening)), 'times': [], 'nodes': []}
+    names = {base.BLACK: black, base.WHITE: white}
+    try:
+        while player is not None:
+            engine.nodes = 0
+            start = time.perf_counter()
+            try:
+                move = engine.get_move(strategies[names[player]], player, board)
+            except engine.IllegalMoveError:
+                # An illegal move forfeits the game by the largest possible margin.
+                record['illegal'] = names[player]
+                record['score'] = -64 if player == base.BLACK else 64
+                return record
+            record['times'].append(round(1000 * (time.perf_counter() - start)))
+            record['nodes'].append(engine.nodes)
+            record['moves'] += str(move)
+            engine.make_move(move, player, board)
+            player = engine.next_player(board, player)
+    finally:
+        # A pondering strategy would otherwise search on into the next game.
+        engine.stop_pondering(strategies[black], strategies[white])
+    record['score'] = engine.score(base.BLACK, board)
+    return record
+
+
+# Each worker process builds its own engine and strategies once.
+_engine = None
+_strategies = None
+
+
+def init_worker():
+    global _engine, _strategies
+    _engine = HeadlessEngine()
+    _strategies = shell.build_options(_engine)
+
+
+def run_game(task):
+    """Play the game described by task = (black, white, opening) in a worker."""
+    black, white, opening = task
+    return play_game(_engine, black, white, _strategies, opening)
+
+
+# -----------------------------------------------------------------------------
+## Schedules
+
+def round_robin(entries):
+    """Every entry plays every other entry."""
+    return [(a, b) for i, a in enumerate(entries) for b in entries[i + 1:]]
+
+
+def gauntlet(challenger, opponents):
+    """The challenger plays each of the opponents."""
+    return [(challenger, opponent) for opponent in opponents]
+
+
+def schedule(pairings, pairs, random_plies, seed=0):
+    """
+    Expand pairings into (black, white, opening) games: `pairs` color-swapped
+    pairs of games per pairing, each pair sharing a random opening.
+    """
+    engine, rng = HeadlessEngine(), random.Random(seed)
+    games = []
+    for a, b in pairings:
+        for _ in range(pairs):
+            opening = random_opening(engine, random_plies, rng)
+            games.append((a, b, opening))
+            games.append((b, a, opening))
+    return games
+
+
+def run(games, out_path, processes=None):
+    """
+    Play the games, appending each record to out_path as it finishes, and
+    return the records.  With processes=1 the games are played in this
+    process, which is needed for strategies that start processes of their own.
+    """
+    played = []
+    with open(out_path, 'a') as out:
+        if processes == 1:
+            init_worker()
+            records = map(run_game, games)
+        else:
+            pool = multiprocessing.Pool(processes, init_worker)
+            records = pool.imap_unordered(run_game, games)
+        for record in records:
+            out.write(json.dumps(record, separators=(',', ':')) + '\n')
+            out.flush()
+            played.append(record)
+        if processes != 1:
+            pool.close()
+            pool.join()
+    return played
+
+
+# -----------------------------------------------------------------------------
+## Results
+
+def read_records(path):
+    """Yield the game records of a results file, one line at a time."""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load(path):
+    """Read the game records from a results file."""
+    return list(read_records(path))
+
+
+def elo(fraction):
+    """
+    The Elo difference that predicts the given expected score: infinite for
+    a score of 0 or 1, since no finite difference predicts those.
+    """
+    if fraction <= 0:
+        return -math.inf
+    if fraction >= 1:
+        return math.inf
+    return -400 * math.log10(1 / fraction - 1)
+
+
+def score_interval(fraction, games, z=1.96):
+    """
+    The Wilson score interval for a score fraction over `games` games.  Unlike
+    the mean plus or minus z standard deviations, it does not shrink to a
+    point when every game was won (or lost), and never leaves [0, 1].
+    """
+    z2 = z * z / games
+    center = (fraction + z2 / 2) / (1 + z2)
+    half = z / (1 + z2) * math.sqrt(fraction * (1 - fraction) / games + z2 / (4 * games))
+    return max(center - half, 0.0), min(center + half, 1.0)
+
+
+def summarize(records):
+    """
+    Per entry: games, wins, draws, losses, score fraction (a draw counts a
+    half) and Elo difference from the field with a 95% confidence interval
+    (infinite bounds are unbounded).
+    """
+    stats = {}
+    for record in records:
+        black_points = 1.0 if record['score'] > 0 else 0.0 if record['score'] < 0 else 0.5
+        for name, points in ((record['black'], black_points),
+                             (record['white'], 1 - black_points)):
+            s = stats.setdefault(name, {'games': 0, 'wins': 0, 'draws': 0, 'losses': 0,
+                                        'points': 0.0})
+            s['games'] += 1
+            s['points'] += points
+            s['wins' if points == 1 else 'draws' if points == 0.5 else 'losses'] += 1
+    for s in stats.values():
+        mean = s['points'] / s['games']
+        low, high = score_interval(mean, s['games'])
+        s['fraction'] = mean
+        s['elo'] = elo(mean)
+        s['elo_low'], s['elo_high'] = elo(low), elo(high)
+        del s['points']
+    return stats
+
+
+def print_summary(stats):
+    print('%-28s %6s %5s %5s %5s %6s %18s' % ('entry', 'games', 'won', 'drawn', 'lost',
+                                               'score', 'elo (95%)'))
+    for name, s in sorted(stats.items(), key=lambda item: -item[1]['fraction']):
+        print('%-28s %6d %5d %5d %5d %6.3f %6.0f [%4.0f, %4.0f]'
+              % (name, s['games'], s['wins'], s['draws'], s['losses'], s['fraction'],
+                 s['elo'], s['elo_low'], s['elo_high']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play a headless Othello tournament.')
+    parser.add_argument('format', choices=('round-robin', 'gauntlet'))
+    parser.add_argument('entries', nargs='+',
+                        help='strategy names from othello_shell; a gauntlet\'s first entry '
+                             'plays all the others')
+    parser.add_argument('--pairs', type=int, default=10,
+                        help='color-swapped pairs of games per pairing')
+    parser.add_argument('--random-plies', type=int, default=4)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='tournament.jsonl',
+                        help='results file, appended to')
+    args = parser.parse_args()
+
+    if args.format == 'round-robin':
+        pairings = round_robin(args.entries)
+    else:
+        pairings = gauntlet(args.entries[0], args.entries[1:])
+    games = schedule(pairings, args.pairs, args.random_plies, args.seed)
+    # The results file may hold earlier tournaments too; only this one's games
+    # are summed up.
+    print_summary(summarize(run(games, args.out, args.processes)))
+
+
+if __name__ == "__main__":
+    main()
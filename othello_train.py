@@ -0,0 +1,248 @@
+"""
+Fit evaluation weights to the outcomes of self-play games.
+
+An evaluation is a guess at how a game will end.  Given many positions and
+the final disc difference of the game each came from, the weights that guess
+best can be fitted instead of chosen by hand.  Training is three steps, each
+reading the previous step's file:
+
+    python othello_train.py generate ab-weighted-diff --games 2000 --out games.jsonl
+    python othello_train.py positions games.jsonl --out positions.bin
+    python othello_train.py fit patterns positions.bin --out othello_patterns.bin
+
+`generate` plays games with `othello_tournament` (any strategy from the
+shell, a random opening each game so the games differ); `positions` also
+ingests game records from tournaments or anywhere else in the same format.
+`positions` appends to its output, so positions from several batches of games
+build up in one file.  With `--unique-plies`, the opening positions that every
+game passes through are merged over their symmetric images and written once,
+with their mean result, instead of once per game.
+
+A positions file is a flat array of `RECORD`s: the board as 64 int8 codes from
+the side to move (+1 own, -1 the opponent's, 0 empty, squares in
+`othello_tables.SQUARES` order), the number of empty squares, and the final
+disc difference for the side to move.  `fit` reads it in chunks through a
+memory map, so memory stays bounded however many millions of positions it
+holds, and does all the arithmetic a chunk at a time with NumPy (2.0 or
+later; unlike the engines, training cannot do without it).  Two models
+can be fitted:
+
+- `squares`: one weight per square (like `SQUARE_WEIGHTS`), by least squares.
+  The normal equations are summed chunk by chunk and solved once; the weights
+  are written as JSON for `othello_eval.SquareEvaluator`.
+- `patterns`: the tables of `othello_patterns`, by stochastic gradient descent
+  over several passes through the file, written as a tables file for
+  `othello_patterns.PatternEvaluator`.
+
+Either way the fitted values are in units of 1/`SCALE` of a disc, so an
+evaluation predicts the final disc difference times `SCALE`.
+"""
+
+import argparse
+import json
+import random
+
+import numpy as np
+
+import othello_base as base
+import othello_eval as evaluation
+import othello_patterns as patterns
+import othello_symmetry as symmetry
+import othello_tables as tables
+import othello_tournament as tournament
+
+RECORD = np.dtype([('board', 'i1', 64), ('empty', 'i1'), ('score', 'i1')])
+
+# Evaluation units per disc of final difference.
+SCALE = 8
+
+CHUNK = 65536
+
+
+# -----------------------------------------------------------------------------
+## Data
+
+def generate(strategy, games, out_path, random_plies=10, seed=0, processes=None):
+    """Play `games` self-play games of a shell strategy, appending them to out_path."""
+    # Color-swapped pairs of games between a strategy and itself are the same
+    # game, so only the first of each pair is played.
+    tournament.run(tournament.schedule([(strategy, strategy)], games, random_plies, seed)[::2],
+                   out_path, processes)
+
+
+def game_positions(engine, record):
+    """The (player, board) before every move of a game record, and the final board."""
+    board, player = engine.initial_board(), base.BLACK
+    positions = []
+    moves = record['moves']
+    for i in range(0, len(moves), 2):
+        positions.append((player, list(board)))
+        engine.make_move(int(moves[i:i + 2]), player, board)
+        player = engine.next_player(board, player)
+    return positions, board
+
+
+def positions(games_paths, out_path, unique_plies=0):
+    """
+    Append a record for every position of the finished games in games_paths
+    to out_path; return how many were written.  The positions in the first
+    `unique_plies` plies of the games, which recur from game to game, are
+    written once per canonical form (see `othello_symmetry`) with their mean
+    result.
+    """
+    engine = tournament.HeadlessEngine()
+    written = 0
+    merged = {}
+    with open(out_path, 'ab') as out:
+        for path in games_paths:
+            for record in tournament.read_records(path):
+                if 'illegal' in record:
+                    continue
+                game, final = game_positions(engine, record)
+                if not game:
+                    continue
+                score = engine.score(base.BLACK, final)
+                data = np.zeros(len(game), dtype=RECORD)
+                data['board'] = evaluation.to_array(base.BLACK, [board for _, board in game])
+                white = np.array([player == base.WHITE for player, _ in game])
+                data['board'][white] *= -1
+                data['empty'] = [board.count(base.EMPTY) for _, board in game]
+                data['score'] = np.where(white, -score, score)
+                for (player, board), row in zip(game[:unique_plies], data):
+                    key = symmetry.canonical_board(player, board)[0]
+                    entry = merged.setdefault(key, [row.copy(), 0, 0])
+                    entry[1] += 1
+                    entry[2] += int(row['score'])
+                data[unique_plies:].tofile(out)
+                written += len(data[unique_plies:])
+        for row, count, total in merged.values():
+            row['score'] = round(total / count)
+            row.tofile(out)
+        written += len(merged)
+    return written
+
+
+def chunks(path, size=CHUNK, shuffle=False, seed=0):
+    """Read a positions file `size` records at a time, in order or shuffled by chunk."""
+    data = np.memmap(path, dtype=RECORD, mode='r')
+    starts = list(range(0, len(data), size))
+    if shuffle:
+        random.Random(seed).shuffle(starts)
+    for start in starts:
+        yield np.array(data[start:start + size])
+
+
+# -----------------------------------------------------------------------------
+## Square weights
+
+def fit_squares(path, ridge=1.0):
+    """Least-squares square weights (100 of them, like `SQUARE_WEIGHTS`)."""
+    xtx = np.zeros((64, 64))
+    xty = np.zeros(64)
+    for chunk in chunks(path):
+        x = chunk['board'].astype(np.float64)
+        xtx += x.T @ x
+        xty += x.T @ (SCALE * chunk['score'].astype(np.float64))
+    fitted = np.linalg.solve(xtx + ridge * np.eye(64), xty)
+    weights = [0] * 100
+    for sq, w in zip(tables.SQUARES, fitted):
+        weights[sq] = int(round(w))
+    return weights
+
+
+def square_error(path, weights):
+    """Root mean square error, in discs, of square weights over a positions file."""
+    fitted = np.array([weights[sq] for sq in tables.SQUARES], dtype=np.float64)
+    total = count = 0
+    for chunk in chunks(path):
+        err = chunk['board'] @ fitted / SCALE - chunk['score']
+        total += float(err @ err)
+        count += len(chunk)
+    return (total / count) ** 0.5 if count else 0.0
+
+
+# -----------------------------------------------------------------------------
+## Pattern tables
+
+# For every pattern instance: its table offset, the positions of its squares
+# in the (N, 64) board array, and the power of 3 of each square's digit (the
+# first square is the most significant, as in `othello_patterns.indexes`).
+PATTERN_COLUMNS = [(offset, np.array([tables.SQUARES.index(sq) for sq in squares]),
+                    3 ** np.arange(len(squares) - 1, -1, -1))
+                   for (_, squares), (offset, _, _) in zip(patterns.INSTANCES, patterns.SLICES)]
+
+
+def pattern_indexes(boards, empty):
+    """The index into the flat tables of every instance: an (N, 46) array."""
+    digits = np.where(boards < 0, 2, boards).astype(np.int64)
+    columns = [digits[:, squares] @ powers + offset for offset, squares, powers in PATTERN_COLUMNS]
+    phase = np.minimum((60 - empty.astype(np.int64)) // patterns.PHASE_PLIES,
+                       patterns.PHASES - 1)
+    return np.stack(columns, axis=1) + (phase * patterns.PHASE_SIZE)[:, None]
+
+
+def fit_patterns(path, epochs=5, rate=0.5, seed=0, report=print):
+    """
+    Pattern tables fitted by stochastic gradient descent, one chunk at a time.
+    Each entry moves by `rate` times the mean error of the positions using it.
+    """
+    size = patterns.PHASES * patterns.PHASE_SIZE
+    weights = np.zeros(size)
+    for epoch in range(epochs):
+        total = count = 0
+        for chunk in chunks(path, shuffle=True, seed=seed + epoch):
+            index = pattern_indexes(chunk['board'], chunk['empty'])
+            err = SCALE * chunk['score'] - weights[index].sum(axis=1)
+            flat = index.ravel()
+            gradient = np.bincount(flat, np.repeat(err, index.shape[1]), minlength=size)
+            uses = np.bincount(flat, minlength=size)
+            weights += rate * gradient / np.maximum(uses, 1) / index.shape[1]
+            total += float(err @ err)
+            count += len(chunk)
+        report('epoch %d: rms error %.2f discs' % (epoch + 1, (total / count) ** 0.5 / SCALE))
+    return np.clip(np.round(weights), -32768, 32767).astype(np.int16)
+
+
+# -----------------------------------------------------------------------------
+## Command line
+
+def main():
+    parser = argparse.ArgumentParser(description='Fit Othello evaluation weights.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    gen = commands.add_parser('generate', help='play self-play games')
+    gen.add_argument('strategy', help='a strategy from the shell, e.g. ab-weighted-diff')
+    gen.add_argument('--games', type=int, default=100)
+    gen.add_argument('--random-plies', type=int, default=10)
+    gen.add_argument('--seed', type=int, default=0)
+    gen.add_argument('--processes', type=int, default=None)
+    gen.add_argument('--out', default='games.jsonl')
+    pos = commands.add_parser('positions', help='extract positions from game records')
+    pos.add_argument('games', nargs='+', help='game records (JSON lines)')
+    pos.add_argument('--unique-plies', type=int, default=0,
+                     help='merge the positions of the first plies over all games')
+    pos.add_argument('--out', default='positions.bin')
+    fit = commands.add_parser('fit', help='fit weights to a positions file')
+    fit.add_argument('model', choices=('squares', 'patterns'))
+    fit.add_argument('positions')
+    fit.add_argument('--out', required=True)
+    fit.add_argument('--epochs', type=int, default=5)
+    fit.add_argument('--rate', type=float, default=0.5)
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        generate(args.strategy, args.games, args.out, args.random_plies, args.seed,
+                 args.processes)
+    elif args.command == 'positions':
+        print('%d positions added to %s'
+              % (positions(args.games, args.out, args.unique_plies), args.out))
+    elif args.model == 'squares':
+        weights = fit_squares(args.positions)
+        with open(args.out, 'w') as out:
+            json.dump({'scale': SCALE, 'square_weights': weights}, out)
+        print('rms error %.2f discs' % square_error(args.positions, weights))
+    else:
+        patterns.write_tables(fit_patterns(args.positions, args.epochs, args.rate), args.out)
+
+
+if __name__ == "__main__":
+    main()
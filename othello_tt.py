@@ -0,0 +1,249 @@
+"""
+Zobrist hashing and a transposition table for the Othello searchers.
+
+Alpha-beta reaches the same position through many different move orders.  A
+transposition table remembers what an earlier search learned about a position
+(how deep it looked, the value or bound it found, and the best move) so the
+next visit can reuse it instead of searching the subtree again.
+
+Positions are identified by a Zobrist key: every (square, color) pair gets a
+random 64-bit number and a board's key is the XOR of the numbers of its pieces,
+plus one more number when White is to move.  Because XOR undoes itself, a move
+updates the key with one XOR for the placed piece and two for each flip.
+"""
+
+import random
+from multiprocessing import shared_memory
+
+import othello_base as ob
+
+# -----------------------------------------------------------------------------
+## Zobrist keys
+
+# The keys use a fixed seed so that every process (and every run) agrees on
+# them.
+_rng = random.Random(0x07e110)
+ZOBRIST = {ob.BLACK: [_rng.getrandbits(64) for _ in range(100)],
+           ob.WHITE: [_rng.getrandbits(64) for _ in range(100)]}
+ZOBRIST_WHITE_TO_MOVE = _rng.getrandbits(64)
+# Flipping a piece removes one color and adds the other.
+ZOBRIST_FLIP = [b ^ w for b, w in zip(ZOBRIST[ob.BLACK], ZOBRIST[ob.WHITE])]
+
+
+def zobrist_key(player, board):
+    """Compute the key of a board with `player` to move from scratch."""
+    key = ZOBRIST_WHITE_TO_MOVE if player == ob.WHITE else 0
+    black, white = ZOBRIST[ob.BLACK], ZOBRIST[ob.WHITE]
+    for sq, piece in enumerate(board):
+        if piece == ob.BLACK:
+            key ^= black[sq]
+        elif piece == ob.WHITE:
+            key ^= white[sq]
+    return key
+
+
+def update_key(key, move, player, flips):
+    """Key after `player` plays `move` flipping `flips`; the side to move changes."""
+    key ^= ZOBRIST[player][move] ^ ZOBRIST_WHITE_TO_MOVE
+    for sq in flips:
+        key ^= ZOBRIST_FLIP[sq]
+    return key
+
+
+def pass_key(key):
+    """Key after the player to move passes."""
+    return key ^ ZOBRIST_WHITE_TO_MOVE
+
+
+# -----------------------------------------------------------------------------
+## The table
+
+# A stored value is either the exact value of the position or only a bound on
+# it: a search that failed high proves a lower bound, one that failed low an
+# upper bound.
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Rough size in bytes of one stored entry (the tuple, its key and the slot that
+# points at it), used to turn a memory budget into a number of slots.
+ENTRY_BYTES = 136
+
+
+def bound_flag(value, alpha, beta):
+    """Classify a search result against the window it was searched with."""
+    if value <= alpha:
+        return UPPER
+    if value >= beta:
+        return LOWER
+    return EXACT
+
+
+class TranspositionTable:
+    """
+    A fixed-size, always-indexed table of search results.
+
+    Each key maps to one slot (the low bits of the key).  When two positions
+    share a slot the new entry wins if the old one is from an earlier search,
+    or if the new one was searched at least as deep.
+    """
+
+    def __init__(self, megabytes=32):
+        slots = max(1, megabytes * 2 ** 20 // ENTRY_BYTES)
+        self.size = 1 << (slots.bit_length() - 1)
+        self.mask = self.size - 1
+        self.clear()
+
+    def clear(self):
+        """Forget every entry."""
+        self.slots = [None] * self.size
+        self.generation = 0
+        self.probes = self.hits = self.stores = 0
+
+    def new_search(self):
+        """Mark existing entries as old so a new search can overwrite them."""
+        self.generation += 1
+
+    def get(self, key):
+        """Return the (key, depth, flag, value, move, generation) entry or None."""
+        self.probes += 1
+        entry = self.slots[key & self.mask]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, depth, flag, value, move):
+        """Record a search result, subject to the replacement policy."""
+        index = key & self.mask
+        old = self.slots[index]
+        if (old is None or old[0] == key or old[5] != self.generation
+                or depth >= old[1]):
+            self.slots[index] = (key, depth, flag, value, move, self.generation)
+            self.stores += 1
+
+    def lookup(self, key, depth, alpha, beta):
+        """
+        Probe the table before searching a node to `depth` with window
+        (alpha, beta).  Returns (value, move, alpha, beta): `value` is not None
+        when the stored result settles the node outright, the window may be
+        narrowed by a stored bound, and `move` is the stored best move (or None)
+        to try first.
+        """
+        entry = self.get(key)
+        if entry is None:
+            return None, None, alpha, beta
+        _, entry_depth, flag, value, move, _ = entry
+        if entry_depth >= depth:
+            if flag == EXACT:
+                return value, move, alpha, beta
+            if flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value, move, alpha, beta
+        return None, move, alpha, beta
+
+    def hit_rate(self):
+        """Fraction of probes that found their position."""
+        return self.hits / self.probes if self.probes else 0.0
+
+    def __len__(self):
+        return sum(entry is not None for entry in self.slots)
+
+
+# -----------------------------------------------------------------------------
+## A table shared between processes
+
+# Worker processes searching the same position can share what they learn
+# through one table in shared memory.  Each slot is two 64-bit words: the entry
+# packed into `data`, and `key ^ data`.  Nothing is locked; if two processes
+# write a slot at once and a reader sees half of each, the XOR no longer gives
+# back the key and the entry is ignored.  The table is lossy, never wrong.
+
+SHARED_ENTRY_BYTES = 16
+VALUE_OFFSET = 1 << 31
+
+
+def pack_entry(depth, flag, value, move, generation):
+    """Pack an entry into 64 bits; value must be an integer."""
+    return ((value + VALUE_OFFSET) | depth << 32 | flag << 40 | (move or 0) << 42
+            | (generation & 0xff) << 49)
+
+
+def unpack_entry(data):
+    """Return (depth, flag, value, move, generation) from packed bits."""
+    return ((data >> 32) & 0xff, (data >> 40) & 0x3, (data & 0xffffffff) - VALUE_OFFSET,
+            (data >> 42) & 0x7f or None, data >> 49)
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """
+    A transposition table in `multiprocessing.shared_memory`, usable from
+    several processes at once.  Create it in one process and attach to it from
+    others with `SharedTranspositionTable.attach(table.name, table.size)`.
+    Stored values must be integers.
+    """
+
+    def __init__(self, megabytes=32, name=None, size=None):
+        if name is None:
+            slots = max(1, megabytes * 2 ** 20 // SHARED_ENTRY_BYTES)
+            size = 1 << (slots.bit_length() - 1)
+            self.memory = shared_memory.SharedMemory(create=True,
+                                                     size=size * SHARED_ENTRY_BYTES)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.name = self.memory.name
+        self.size = size
+        self.mask = size - 1
+        self.words = self.memory.buf.cast('Q')
+        self.generation = 0
+        self.probes = self.hits = self.stores = 0
+        if name is None:
+            self.clear()
+
+    @classmethod
+    def attach(cls, name, size):
+        """Open a table created by another process."""
+        return cls(name=name, size=size)
+
+    def clear(self):
+        """Forget every entry."""
+        self.memory.buf[:self.size * SHARED_ENTRY_BYTES] = bytes(self.size * SHARED_ENTRY_BYTES)
+        self.probes = self.hits = self.stores = 0
+
+    def get(self, key):
+        """Return the (key, depth, flag, value, move, generation) entry or None."""
+        self.probes += 1
+        index = 2 * (key & self.mask)
+        data = self.words[index + 1]
+        if data and self.words[index] ^ data == key:
+            self.hits += 1
+            return (key,) + unpack_entry(data)
+        return None
+
+    def store(self, key, depth, flag, value, move):
+        """Record a search result, subject to the replacement policy."""
+        index = 2 * (key & self.mask)
+        old = self.words[index + 1]
+        if old:
+            old_depth, _, _, _, old_generation = unpack_entry(old)
+            if (self.words[index] ^ old != key and old_generation == self.generation & 0xff
+                    and depth < old_depth):
+                return
+        data = pack_entry(depth, flag, value, move, self.generation)
+        self.words[index] = key ^ data
+        self.words[index + 1] = data
+        self.stores += 1
+
+    def close(self):
+        """Detach from the shared memory."""
+        self.words.release()
+        self.memory.close()
+
+    def unlink(self):
+        """Detach, and free the shared memory for every process."""
+        self.close()
+        self.memory.unlink()
+
+    def __len__(self):
+        return sum(self.words[2 * i + 1] != 0 for i in range(self.size))
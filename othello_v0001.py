@@ -1,25 +1,37 @@
+import othello_base as base
 import othello_base_GUI as ob
+import othello_bitboard as bitboard
+import othello_book as book
+import othello_endgame as endgame
+import othello_ordering as ordering
+import othello_symmetry as symmetry
+import othello_tables as tables
+import othello_tt as tt
 import random
+import time
 
-SQUARE_WEIGHTS = [
-    0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
-    0, 120, -20, 20, 5, 5, 20, -20, 120, 0,
-    0, -20, -40, -5, -5, -5, -5, -40, -20, 0,
-    0, 20, -5, 15, 3, 3, 15, -5, 20, 0,
-    0, 5, -5, 3, 3, 3, 3, -5, 5, 0,
-    0, 5, -5, 3, 3, 3, 3, -5, 5, 0,
-    0, 20, -5, 15, 3, 3, 15, -5, 20, 0,
-    0, -20, -40, -5, -5, -5, -5, -40, -20, 0,
-    0, 120, -20, 20, 5, 5, 20, -20, 120, 0,
-    0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
-]
+SQUARE_WEIGHTS = tables.SQUARE_WEIGHTS
+
+# Only positions this early in the game are ever symmetric in practice, and
+# only this close to the root of a search is checking for it worth its cost.
+SYMMETRY_EMPTIES = 52
+SYMMETRY_PLIES = 2
 
 # Values for endgame boards are big constants.
 MAX_VALUE = sum(map(abs, SQUARE_WEIGHTS))
 MIN_VALUE = -MAX_VALUE
 
 
-class v0001(ob.OthelloGUI):
+class SearchTimeout(Exception):
+    """Raised inside a search when its time budget has run out."""
+
+
+# The strategies only need the rules of the game, so they are kept apart from
+# the window they are usually played in (see `v0001` at the end): `Strategies`
+# imports no pygame, loads no images or sounds and opens no display, and is
+# what tournaments, benchmarks, training and worker processes build on.
+
+class Strategies(base.OthelloBase):
     # The easiest strategy to implement simply picks a move at random.    
     def random_strategy(self, player, board):
         """A strategy that always chooses a random legal move."""
@@ -42,7 +54,11 @@ class v0001(ob.OthelloGUI):
     
         def strategy(player, board):
             def score_move(move):
-                return evaluate(player, self.make_move(move, player, list(board)))
+                flips = self.do_move(move, player, board)
+                try:
+                    return evaluate(player, board)
+                finally:
+                    self.undo_move(move, player, board, flips)
     
             return max(self.legal_moves(player, board), key=score_move)
     
@@ -87,22 +103,41 @@ class v0001(ob.OthelloGUI):
     # the implications of a move several turns in advance could have a significant
     # advantage.  The **self.minimax** algorithm does just that.
     
-    def minimax(self, player, board, depth, evaluate):
+    def minimax(self, player, board, depth, evaluate, table=None, key=None, ply=0,
+                stats=None):
         """
         Find the best legal move for player, searching to the specified depth.
         Returns a tuple (move, min_score), where min_score is the guaranteed minimum
-        score achievable for player if the move is made.
+        score achievable for player if the move is made.  If a transposition
+        `table` is given, exact values already computed at least this deep are
+        reused; `key` is the board's Zobrist key (computed when omitted).  A
+        `stats` object (see `othello_stats`) counts what the search does.
         """
     
         # We define the value of a board to be the opposite of its value to our
         # self.opponent, computed by recursively applying `self.minimax` for our self.opponent.
-        def value(board):
-            return -self.minimax(self.opponent(player), board, depth - 1, evaluate)[0]
+        def value(board, key=None):
+            return -self.minimax(self.opponent(player), board, depth - 1, evaluate, table, key,
+                                 ply + 1, stats)[0]
+
+        if stats is not None:
+            stats.node(ply)
     
         # When depth is zero, don't examine possible moves--just determine the value
         # of this board to the player.
         if depth == 0:
+            if stats is not None:
+                stats.leaves += 1
             return evaluate(player, board), None
+
+        if table is not None:
+            if key is None:
+                key = self.zobrist_key(player, board)
+            # Only exact values will do: an alpha-beta search sharing the
+            # table stores bounds as well.
+            entry = table.get(key)
+            if entry is not None and entry[1] >= depth and entry[2] == tt.EXACT:
+                return entry[3], entry[4]
     
         # We want to evaluate all the legal moves by considering their implications
         # `depth` turns in advance.  First, find all the legal moves.
@@ -114,14 +149,44 @@ class v0001(ob.OthelloGUI):
             if not self.any_legal_move(self.opponent(player), board):
                 return self.final_value(player, board), None
             # or we have to pass this turn, so just find the value of this board.
-            return value(board), None
+            if stats is not None:
+                stats.passes += 1
+            return value(board, self.pass_key(key)), None
     
         # When there are multiple legal moves available, choose the best one by
         # maximizing the value of the resulting boards.
-        return max((value(self.make_move(m, player, list(board))), m) for m in moves)
+        results = []
+        for m in moves:
+            flips = self.do_move(m, player, board)
+            try:
+                results.append((value(board, self.move_key(key, m, player, flips)), m))
+            finally:
+                self.undo_move(m, player, board, flips)
+        best = max(results)
+        if table is not None:
+            table.store(key, depth, tt.EXACT, best[0], best[1])
+        return best
     
 
     
+    # With a transposition table each board travels with its Zobrist key, which
+    # is updated from the flipped squares instead of being recomputed.
+
+    def zobrist_key(self, player, board):
+        """The key of a board with player to move, computed from scratch."""
+        return tt.zobrist_key(player, board)
+
+
+    def move_key(self, key, move, player, flips):
+        """The key after a move, or None when no key is being tracked."""
+        return None if key is None else tt.update_key(key, move, player, flips)
+
+
+    def pass_key(self, key):
+        """The key after a pass, or None when no key is being tracked."""
+        return None if key is None else tt.pass_key(key)
+
+
     def final_value(self, player, board):
         """The game is over--find the value of this board to player."""
         diff = self.score(player, board)
@@ -132,15 +197,36 @@ class v0001(ob.OthelloGUI):
         return diff
     
     
-    def minimax_searcher(self, depth, evaluate):
+    # The searchers are handed list boards, and search whatever `search_board`
+    # makes of them: the board itself here, but an engine that keeps positions
+    # in another form (`othello_bitboard.BitboardMixin`) converts it once,
+    # at the root, and never again below it.
+
+    def search_board(self, board):
+        """The board a search from `board` works on."""
+        return board
+
+
+    def minimax_searcher(self, depth, evaluate, table=None, stats=None):
         """
         Construct a strategy that uses `self.minimax` with the specified leaf board
-        evaluation function.
+        evaluation function, and optionally a transposition table and a
+        `SearchStats` to fill in.
         """
     
         def strategy(player, board):
-            return self.minimax(player, board, depth, evaluate)[1]
-    
+            board = self.search_board(board)
+            if table is not None:
+                table.new_search()
+            if stats is not None:
+                stats.start(table)
+            val, move = self.minimax(player, board, depth, evaluate, table, stats=stats)
+            if stats is not None:
+                stats.iteration(depth, val, move)
+                stats.finish(self, player, board, move)
+            return move
+    
+        strategy.stats = stats
         return strategy
     
     
@@ -168,15 +254,34 @@ class v0001(ob.OthelloGUI):
     # we can quit searching this subtree since the self.opponent can prevent us from
     # playing it.
     
-    def alphabeta(self, player, board, alpha, beta, depth, evaluate):
+    def alphabeta(self, player, board, alpha, beta, depth, evaluate, table=None, key=None,
+                  orderer=None, ply=0, stats=None):
         """
         Find the best legal move for player, searching to the specified depth.  Like
-        self.minimax, but uses the bounds alpha and beta to prune branches.
+        self.minimax, but uses the bounds alpha and beta to prune branches.  With a
+        transposition `table`, each position is looked up before it is expanded;
+        with a move `orderer`, moves are tried best-first and cutoffs reported to
+        it (`ply` is the distance from the root); with `stats`, they are counted.
         """
+        if stats is not None:
+            stats.node(ply)
         if depth == 0:
+            if stats is not None:
+                stats.leaves += 1
             return evaluate(player, board), None
-    
-        def value(board, alpha, beta):
+
+        # A stored result may settle this position outright or narrow the
+        # window; either way its best move is the one to try first.
+        hash_move = None
+        if table is not None:
+            if key is None:
+                key = self.zobrist_key(player, board)
+            val, hash_move, alpha, beta = table.lookup(key, depth, alpha, beta)
+            if val is not None:
+                return val, hash_move
+        alpha0 = alpha
+    
+        def value(board, alpha, beta, key=None):
             # Like in `self.minimax`, the value of a board is the opposite of its value
             # to the self.opponent.  We pass in `-beta` and `-alpha` as the alpha and
             # beta values, respectively, for the self.opponent, since `alpha` represents
@@ -184,34 +289,433 @@ class v0001(ob.OthelloGUI):
             # achievable by the self.opponent.  Similarly, `beta` is the worst score that
             # our self.opponent can hold us to, so it is the best score that they can
             # achieve.
-            return -self.alphabeta(self.opponent(player), board, -beta, -alpha, depth - 1, evaluate)[0]
+            return -self.alphabeta(self.opponent(player), board, -beta, -alpha, depth - 1,
+                                   evaluate, table, key, orderer, ply + 1, stats)[0]
     
         moves = self.legal_moves(player, board)
         if not moves:
             if not self.any_legal_move(self.opponent(player), board):
                 return self.final_value(player, board), None
-            return value(board, alpha, beta), None
-    
+            if stats is not None:
+                stats.passes += 1
+            return value(board, alpha, beta, self.pass_key(key)), None
+
+        if orderer is not None:
+            moves = orderer.order(moves, player, ply, hash_move)
+        elif hash_move in moves:
+            moves.remove(hash_move)
+            moves.insert(0, hash_move)
+        if ply < SYMMETRY_PLIES and board.count(base.EMPTY) >= SYMMETRY_EMPTIES:
+            moves = self.distinct_moves(player, board, moves)
         best_move = moves[0]
-        for move in moves:
+        values = self.leaf_values(player, board, moves, evaluate, ply, stats) if depth == 1 else None
+        for index, move in enumerate(moves):
             if alpha >= beta:
                 # If one of the legal moves leads to a better score than beta, then
                 # the self.opponent will avoid this branch, so we can quit looking.
                 break
-            val = value(self.make_move(move, player, list(board)), alpha, beta)
+            if values is not None:
+                val = values[index]
+            else:
+                flips = self.do_move(move, player, board)
+                try:
+                    val = value(board, alpha, beta, self.move_key(key, move, player, flips))
+                finally:
+                    self.undo_move(move, player, board, flips)
             if val > alpha:
                 # If one of the moves leads to a better score than the current best
                 # achievable score, then replace it with this one.
                 alpha = val
                 best_move = move
+                if alpha >= beta:
+                    if orderer is not None:
+                        orderer.cutoff(move, player, ply, depth, index)
+                    if stats is not None:
+                        stats.cutoff(index)
+        if table is not None:
+            table.store(key, depth, tt.bound_flag(alpha, alpha0, beta), alpha, best_move)
         return alpha, best_move
     
     
-    def alphabeta_searcher(self, depth, evaluate):
+    # Early in the game a position can be its own mirror image--the start is
+    # symmetric four ways--and then moves that are mirror images of each other
+    # lead to mirror-image positions of equal value, so only one of them needs
+    # searching.
+
+    def distinct_moves(self, player, board, moves):
+        """The moves, less those that mirror an earlier one in a symmetric position."""
+        key, symmetries = symmetry.canonical_board(player, board)
+        if len(symmetries) == 1:
+            return moves
+        seen, distinct = set(), []
+        for move in moves:
+            image = symmetry.canonical_move(move, symmetries)
+            if image not in seen:
+                seen.add(image)
+                distinct.append(move)
+        return distinct
+
+    # One ply above the leaves every child is evaluated anyway (up to a cutoff),
+    # so an evaluation that can score a batch of boards (`othello_eval`'s
+    # `FeatureEvaluator.evaluate_boards`) gets them all in one call.  The
+    # children after a cutoff are evaluated for nothing, but a batch costs
+    # less than evaluating them one at a time.
+
+    def leaf_values(self, player, board, moves, evaluate, ply=0, stats=None):
+        """
+        The value to player of the board after each of the moves, when
+        `evaluate` has an `evaluate_boards(player, boards)` method to score them
+        all at once; otherwise None, and the children are searched as usual.
+        """
+        evaluate_boards = getattr(evaluate, 'evaluate_boards', None)
+        if evaluate_boards is None:
+            return None
+        boards = []
+        for move in moves:
+            flips = self.do_move(move, player, board)
+            boards.append(board[:100])
+            self.undo_move(move, player, board, flips)
+        if stats is not None:
+            for _ in moves:
+                stats.node(ply + 1)
+            stats.leaves += len(moves)
+        return [-val for val in evaluate_boards(self.opponent(player), boards)]
+
+
+    def alphabeta_searcher(self, depth, evaluate, table=None, orderer=None, stats=None):
         def strategy(player, board):
-            return self.alphabeta(player, board, MIN_VALUE, MAX_VALUE, depth, evaluate)[1]
-    
+            board = self.search_board(board)
+            if table is not None:
+                table.new_search()
+            if orderer is not None:
+                orderer.new_search()
+            if stats is not None:
+                stats.start(table)
+            val, move = self.alphabeta(player, board, MIN_VALUE, MAX_VALUE, depth, evaluate,
+                                       table, orderer=orderer, stats=stats)
+            if stats is not None:
+                stats.iteration(depth, val, move)
+                stats.finish(self, player, board, move)
+            return move
+    
+        strategy.stats = stats
+        return strategy
+
+
+    # <a id="pvs"></a>
+    ### Principal variation search
+
+    # With good move ordering the first move searched at a node is usually the
+    # best one.  Principal variation search (also called NegaScout) bets on it:
+    # the first move gets the full (alpha, beta) window, and every later move is
+    # only tested with a null window (alpha, alpha + 1), which asks "is this move
+    # better than the first?" and prunes far more than a full window would.  In
+    # the rare case that the answer is yes, the move is searched again with the
+    # full window to find its real value.  Null windows assume the evaluation
+    # returns integers, as `score` and `weighted_score` do.
+
+    def pvs(self, player, board, alpha, beta, depth, evaluate, table=None, key=None,
+            orderer=None, ply=0, stats=None):
+        """
+        Find the best legal move for player like `self.alphabeta`, but search
+        every move after the first with a null window.  Unlike `self.alphabeta`
+        the value returned may lie outside (alpha, beta) ("fail-soft"), which
+        gives the null-window tests a tighter bound to work with.
+        """
+        if stats is not None:
+            stats.node(ply)
+        if depth == 0:
+            if stats is not None:
+                stats.leaves += 1
+            return evaluate(player, board), None
+
+        hash_move = None
+        if table is not None:
+            if key is None:
+                key = self.zobrist_key(player, board)
+            val, hash_move, alpha, beta = table.lookup(key, depth, alpha, beta)
+            if val is not None:
+                return val, hash_move
+        alpha0 = alpha
+
+        def value(board, alpha, beta, key=None):
+            return -self.pvs(self.opponent(player), board, -beta, -alpha, depth - 1,
+                             evaluate, table, key, orderer, ply + 1, stats)[0]
+
+        moves = self.legal_moves(player, board)
+        if not moves:
+            if not self.any_legal_move(self.opponent(player), board):
+                return self.final_value(player, board), None
+            if stats is not None:
+                stats.passes += 1
+            return value(board, alpha, beta, self.pass_key(key)), None
+
+        if orderer is not None:
+            moves = orderer.order(moves, player, ply, hash_move)
+        elif hash_move in moves:
+            moves.remove(hash_move)
+            moves.insert(0, hash_move)
+        if ply < SYMMETRY_PLIES and board.count(base.EMPTY) >= SYMMETRY_EMPTIES:
+            moves = self.distinct_moves(player, board, moves)
+        best, best_move = MIN_VALUE - 1, moves[0]
+        values = self.leaf_values(player, board, moves, evaluate, ply, stats) if depth == 1 else None
+        for index, move in enumerate(moves):
+            if values is not None:
+                val = values[index]
+            else:
+                flips = self.do_move(move, player, board)
+                child_key = self.move_key(key, move, player, flips)
+                try:
+                    if index == 0:
+                        val = value(board, alpha, beta, child_key)
+                    else:
+                        val = value(board, alpha, alpha + 1, child_key)
+                        if alpha < val < beta:
+                            # The null window failed high: this move beats the first
+                            # one, and is worth at least val, so find out by how much.
+                            val = value(board, val, beta, child_key)
+                finally:
+                    self.undo_move(move, player, board, flips)
+            if val > best:
+                best, best_move = val, move
+            if val > alpha:
+                alpha = val
+                if alpha >= beta:
+                    if orderer is not None:
+                        orderer.cutoff(move, player, ply, depth, index)
+                    if stats is not None:
+                        stats.cutoff(index)
+                    break
+        if table is not None:
+            table.store(key, depth, tt.bound_flag(best, alpha0, beta), best, best_move)
+        return best, best_move
+
+
+    def pvs_searcher(self, depth, evaluate, table=None, orderer=None, stats=None):
+        def strategy(player, board):
+            board = self.search_board(board)
+            if table is not None:
+                table.new_search()
+            if orderer is not None:
+                orderer.new_search()
+            if stats is not None:
+                stats.start(table)
+            val, move = self.pvs(player, board, MIN_VALUE, MAX_VALUE, depth, evaluate, table,
+                                 orderer=orderer, stats=stats)
+            if stats is not None:
+                stats.iteration(depth, val, move)
+                stats.finish(self, player, board, move)
+            return move
+
+        strategy.stats = stats
+        return strategy
+
+
+    # <a id="mtdf"></a>
+    ### MTD(f)
+
+    # A search with a null window (beta - 1, beta) cannot find a position's value,
+    # but it can quickly answer whether the value is at least beta.  MTD(f)
+    # homes in on the value with a series of these tests, starting from a first
+    # guess: each fail-high raises the lower bound, each fail-low lowers the
+    # upper bound, and the next test is made at the bound just found.  With a
+    # good guess only a few tests are needed, and the transposition table keeps
+    # them from searching the same tree again.  A null-window `self.pvs` is a
+    # fail-soft, table-backed alpha-beta, which is exactly the test MTD(f) wants.
+
+    def mtdf(self, player, board, guess, depth, evaluate, table, orderer=None, stats=None):
+        """
+        Find the value and best move for player by null-window searches around
+        `guess`.  Requires a transposition table.
+        """
+        lower, upper = MIN_VALUE, MAX_VALUE
+        val, best_move = guess, None
+        while lower < upper:
+            beta = max(val, lower + 1)
+            val, move = self.pvs(player, board, beta - 1, beta, depth, evaluate, table,
+                                 orderer=orderer, stats=stats)
+            if val < beta:
+                upper = val
+            else:
+                lower = val
+                # Only a fail-high proves that this move reaches the bound.
+                best_move = move
+            if best_move is None:
+                best_move = move
+        return val, best_move
+
+
+    # Values from `weighted_score` swing between odd and even depths, so the
+    # best first guess for a depth is the value found two plies shallower, or
+    # for the shallowest depths, the value found at that depth on our previous
+    # move.
+
+    def mtdf_searcher(self, depth, evaluate, table=None, orderer=None, stats=None):
+        """
+        Construct a strategy that deepens MTD(f) searches to `depth`, taking
+        each first guess from an earlier iteration or the previous move.
+        """
+        if table is None:
+            table = tt.TranspositionTable()
+        if orderer is None:
+            orderer = ordering.MoveOrderer(SQUARE_WEIGHTS)
+        previous = {}
+
+        def strategy(player, board):
+            board = self.search_board(board)
+            table.new_search()
+            orderer.new_search()
+            if stats is not None:
+                stats.start(table)
+            last, values = previous.get(player, {}), {}
+            for d in range(1, depth + 1):
+                guess = values.get(d - 2, last.get(d, values.get(d - 1, 0)))
+                values[d], move = self.mtdf(player, board, guess, d, evaluate, table, orderer,
+                                            stats)
+                if stats is not None:
+                    stats.iteration(d, values[d], move)
+            previous[player] = values
+            if stats is not None:
+                stats.finish(self, player, board, move)
+            return move
+
+        strategy.stats = stats
+        return strategy
+
+
+    # <a id="endgame"></a>
+    ### Endgame solving
+
+    # With only a few empty squares left we can search to the end of the game.
+    # The exact solver in `othello_endgame` returns the final disc differential,
+    # so it prefers a wide win to a narrow one, which `final_value`'s win/loss
+    # constants cannot.  In win/loss/draw mode it only proves the result, which
+    # is cheaper and allows it to take over a few empties earlier.
+
+    def endgame_searcher(self, strategy, empties=endgame.ENDGAME_EMPTIES, wld=False):
+        """
+        Construct a strategy that plays `strategy` until at most `empties` empty
+        squares remain, and perfectly from then on.
+        """
+        solver = endgame.EndgameSolver(wld)
+
+        stats = getattr(strategy, 'stats', None)
+
+        def endgame_strategy(player, board):
+            empty = board.count(base.EMPTY)
+            if empty > empties:
+                return strategy(player, board)
+            if stats is None:
+                return solver.best_move(player, board)[1]
+            stats.start()
+            nodes = solver.nodes
+            val, move = solver.best_move(player, board)
+            stats.nodes = [solver.nodes - nodes]
+            stats.iteration(empty, val, move)
+            stats.finish(self, player, board, move)
+            return move
+
+        endgame_strategy.stats = stats
+        return endgame_strategy
+
+
+    # <a id="book"></a>
+    ### Opening book
+
+    # The first moves of a game have been played many times before, and an
+    # opening book (see `othello_book`) knows how they turned out.  Looking a
+    # position up costs a binary search where a search would take seconds.
+    # Past `plies` moves, or when the position is not in the book, the search
+    # takes over.
+
+    def book_searcher(self, strategy, opening_book, plies=book.BOOK_PLIES, randomness=0.0,
+                      rng=None):
+        """
+        Construct a strategy that plays a book move while the game is fewer
+        than `plies` moves old and the position is in `opening_book`, and
+        `strategy` otherwise.  Among the book moves it picks at random from
+        those within `randomness` discs of the best mean result.
+        """
+        if rng is None:
+            rng = random.Random()
+        stats = getattr(strategy, 'stats', None)
+
+        def book_strategy(player, board):
+            if 60 - board.count(base.EMPTY) < plies:
+                move = opening_book.choose(player, board, rng, randomness)
+                if move is not None and self.is_legal(move, player, board):
+                    if stats is not None:
+                        stats.start()
+                        stats.finish(self, player, board, move)
+                    return move
+            return strategy(player, board)
+
+        book_strategy.stats = stats
+        return book_strategy
+
+
+    # <a id="timed"></a>
+    ### Iterative deepening
+
+    # A fixed depth takes a moment in the opening and far too long in a busy
+    # midgame.  Instead we can search to depth 1, then 2, then 3, ... and stop
+    # when the clock runs out, playing the best move of the deepest search that
+    # finished.  The shallow searches are cheap, and they fill the transposition
+    # table with best moves: each iteration tries the previous iteration's
+    # principal variation first, which is where alpha-beta prunes the most.
+
+    def timed_searcher(self, seconds, evaluate, table=None, orderer=None, stats=None):
+        """
+        Construct a strategy that deepens an alpha-beta search until `seconds`
+        have passed and returns the best move of the last completed depth.
+        """
+        if table is None:
+            table = tt.TranspositionTable()
+        if orderer is None:
+            orderer = ordering.MoveOrderer(SQUARE_WEIGHTS)
+
+        def strategy(player, board):
+            deadline = time.time() + seconds
+
+            # Checking the clock at every leaf lets an unfinished iteration be
+            # abandoned as soon as the time is up.
+            def timed_evaluate(player, board):
+                if time.time() >= deadline:
+                    raise SearchTimeout()
+                return evaluate(player, board)
+
+            return self.deepen(player, board, timed_evaluate, table, orderer, stats)
+
+        strategy.stats = stats
         return strategy
+
+    def deepen(self, player, board, evaluate, table, orderer, stats=None):
+        """
+        Search to depth 1, 2, 3, ... until `evaluate` raises SearchTimeout and
+        return the best move of the last completed depth.
+        """
+        board = self.search_board(board)
+        table.new_search()
+        orderer.new_search()
+        if stats is not None:
+            stats.start(table)
+        best_move = self.legal_moves(player, board)[0]
+        # There is nothing more to learn once the search reaches the end of
+        # the game along every line.
+        for depth in range(1, board.count(base.EMPTY) + 1):
+            try:
+                val, best_move = self.alphabeta(player, board, MIN_VALUE, MAX_VALUE,
+                                                depth, evaluate, table,
+                                                orderer=orderer, stats=stats)
+            except SearchTimeout:
+                break
+            if stats is not None:
+                stats.iteration(depth, val, best_move)
+            if abs(val) == MAX_VALUE:
+                break
+        if stats is not None:
+            stats.finish(self, player, board, best_move)
+        return best_move
     
     
         # -----------------------------------------------------------------------------
@@ -228,3 +732,17 @@ class v0001(ob.OthelloGUI):
         #
         # [mm]: http://en.wikipedia.org/wiki/self.minimax
         # [ab]: http://en.wikipedia.org/wiki/Alpha-beta_pruning
+
+
+# -----------------------------------------------------------------------------
+## The GUI engine
+
+class v0001(ob.OthelloGUI, Strategies):
+    """The strategies, played in a pygame window."""
+
+
+# -----------------------------------------------------------------------------
+## The bitboard engine
+
+class BitboardEngine(bitboard.BitboardMixin, Strategies):
+    """The strategies, searching on bitboards (see `othello_bitboard`)."""